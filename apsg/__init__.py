@@ -5,7 +5,7 @@ import matplotlib.pyplot as plt
 
 from .core import (Vec3, Fol, Lin, Pair, Fault,
                    Group, PairSet, FaultSet,
-                   Ortensor, Cluster, StereoGrid, G)
+                   Ortensor, OrtensorAccumulator, Cluster, StereoGrid, G)
 from .plotting import StereoNet, FabricPlot
 from .tensors import DefGrad, VelGrad, Stress
 from .db import SDB
@@ -8,14 +8,16 @@ from __future__ import division, print_function
 from copy import deepcopy
 import warnings
 import pickle
+from functools import lru_cache
 
 import numpy as np
 import matplotlib.pyplot as plt
 from .helpers import (sind, cosd, acosd, asind, atand, atan2d,
-                      angle_metric, l2v, getldd)
+                      angle_metric, l2v, p2v, v2l, v2p, getldd)
 from .helpers import (_linear_inverse_kamb, _square_inverse_kamb,
-                      _schmidt_count, _kamb_count, _exponential_kamb)
-from .helpers import KentDistribution
+                      _schmidt_count, _kamb_count, _exponential_kamb,
+                      _kamb_radius)
+from .helpers import KentDistribution, AxialIndex
 
 
 __all__ = ['Vec3', 'Lin', 'Fol', 'Pair', 'Fault',
@@ -740,7 +742,8 @@ class Fault(Pair):
         # return 2 * int(self.fvec**self.lvec == Vec3(self.fol**self.lin)) - 1
         orax = self.fvec.uv**self.lvec.uv
         rax = Vec3(*self.fol.aslin.dd)**Vec3(*self.lin.dd)
-        return 2 * (orax == rax) - 1
+        # axes are equal or opposite, so sign of dot product is robust
+        return 1 if orax * rax > 0 else -1
 
     @property
     def pvec(self):
@@ -773,9 +776,88 @@ class Fault(Pair):
         return (self.rax**self.fvec).asfol
 
 
-class Group(list):
+def _save_npz(fname, meta, **arrays):
+    """Save arrays together with metadata dictionary to uncompressed
+    ``.npz`` file, so arrays could be later memory-mapped."""
+    import json
+    meta = dict(meta, notation=settings['notation'], version=1)
+    np.savez(fname, meta=np.array(json.dumps(meta)), **arrays)
+
+
+def _csv_chunks(fname, cols, delimiter=',', chunksize=2**16, progress=None):
+    """Iterate over csv file in chunks of `chunksize` rows.
+
+    Yields (M, len(cols)) float arrays of selected zero-based columns.
+    Lines are parsed by numpy C parser and comments starting with '#' are
+    skipped. `progress` is callable with number of rows read so far and
+    fraction of file read, or True to print progress."""
+    import os
+    from itertools import islice
+    total = max(os.path.getsize(fname), 1)
+    rows = 0
+    with open(fname, 'rb') as fh:
+        while True:
+            lines = list(islice(fh, chunksize))
+            if not lines:
+                break
+            with warnings.catch_warnings():
+                # chunks containing only comments are empty
+                warnings.simplefilter('ignore', UserWarning)
+                dt = np.loadtxt(lines, dtype=float, delimiter=delimiter,
+                                usecols=cols, ndmin=2)
+            rows += len(dt)
+            if progress is True:
+                print('%s: %d rows read (%.0f%%)' % (fname, rows,
+                                                     100 * fh.tell() / total))
+            elif progress:
+                progress(rows, fh.tell() / total)
+            if len(dt):
+                yield dt
+
+
+def _load_npz(fname, mmap=True):
+    """Load metadata dictionary and arrays from ``.npz`` file created by
+    ``_save_npz``. Arrays stored uncompressed are memory-mapped in
+    copy-on-write mode when `mmap` is True, so data are paged in lazily
+    and changes are never written back to file."""
+    import json
+    import struct
+    import zipfile
+    from numpy.lib import format as npformat
+    arrays = {}
+    with zipfile.ZipFile(fname) as zf, open(fname, 'rb') as fh:
+        for info in zf.infolist():
+            key = info.filename[:-4]
+            if key == 'meta' or not mmap or info.compress_type != zipfile.ZIP_STORED:
+                with zf.open(info) as member:
+                    arrays[key] = np.load(member, allow_pickle=False)
+                continue
+            # data of stored member follow local file header
+            fh.seek(info.header_offset + 26)
+            nlen, elen = struct.unpack('<HH', fh.read(4))
+            fh.seek(info.header_offset + 30 + nlen + elen)
+            version = npformat.read_magic(fh)
+            if version == (1, 0):
+                shape, fortran, dtype = npformat.read_array_header_1_0(fh)
+            else:
+                shape, fortran, dtype = npformat.read_array_header_2_0(fh)
+            arrays[key] = np.memmap(fh, dtype=dtype, mode='c', shape=shape,
+                                    order='F' if fortran else 'C',
+                                    offset=fh.tell()).view(np.ndarray)
+    meta = json.loads(str(arrays.pop('meta')))
+    return meta, arrays
+
+
+class Group(object):
     """Group is homogeneous group of ``Vec3``, ``Fol`` or ``Lin`` objects.
 
+    Data are stored in single contiguous (N, 3) float array of vectors
+    together with type of objects, so all methods and properties are
+    evaluated as whole-array numpy expressions. Indexing by integer still
+    returns ``Vec3``, ``Fol`` or ``Lin`` object. Slicing returns ``Group``
+    sharing data with original one, which are copied on first assignment
+    to items of any of them.
+
     ``Group`` provide append and extend methods as well as list indexing
     to get or set individual items. It also supports following operators:
       - ``+`` - merge groups
@@ -795,28 +877,68 @@ class Group(list):
       >>> g = Group([Lin(120, 20), Lin(151, 23), Lin(137, 28)])
     """
     def __init__(self, data, name='Default'):
-        assert issubclass(type(data), list), 'Argument must be list of data.'
-        assert len(data) > 0, 'Empty group is not allowed.'
-        tp = type(data[0])
-        assert issubclass(tp, Vec3), 'Data must be Fol, Lin or Vec3 type.'
-        assert all([isinstance(e, tp) for e in data]), \
-            'All data in group must be of same type.'
-        super(Group, self).__init__(data)
+        if isinstance(data, Group):
+            dc, tp = data._dc.copy(), data.type
+        else:
+            assert issubclass(type(data), list), 'Argument must be list of data.'
+            assert len(data) > 0, 'Empty group is not allowed.'
+            tp = type(data[0])
+            assert issubclass(tp, Vec3), 'Data must be Fol, Lin or Vec3 type.'
+            assert all([isinstance(e, tp) for e in data]), \
+                'All data in group must be of same type.'
+            dc = np.array(data, dtype=float)
+        self._dc = dc
+        self._buf = None
+        self._shared = False
+        self._stats = None
         self.type = tp
         self.name = name
 
     def __repr__(self):
         return 'G:%g %s (%s)' % (len(self), self.type.__name__, self.name)
 
+    def __len__(self):
+        return self._dc.shape[0]
+
+    def __iter__(self):
+        return iter(self._dc.copy().view(self.type))
+
+    def __array__(self, dtype=None, copy=None):
+        if copy or (dtype is not None and np.dtype(dtype) != self._dc.dtype):
+            return np.array(self._dc, dtype=dtype)
+        # read-only view, so data and cached statistics could not be
+        # changed behind the group
+        v = self._dc.view()
+        v.flags.writeable = False
+        return v
+
     def __abs__(self):
         # abs returns array of euclidean norms
-        return np.asarray([abs(e) for e in self])
+        return np.linalg.norm(self._dc, axis=1)
+
+    def __getstate__(self):
+        # spare capacity and shared views are not pickled
+        state = self.__dict__.copy()
+        state['_dc'] = np.ascontiguousarray(self._dc)
+        state['_buf'] = None
+        state['_shared'] = False
+        return state
+
+    def __setstate__(self, state):
+        if '_dc' not in state:
+            # list based groups of older versions are unpickled by extending
+            # empty object with items before state is restored
+            items = self.__dict__.pop('_items', [])
+            state = dict(state, _dc=np.array(items, dtype=float).reshape(-1, 3),
+                         _buf=None, _shared=False, _stats=None)
+        self.__dict__.update(state)
 
     def __add__(self, other):
         # merge Datasets
         assert isinstance(other, Group), 'Only groups could be merged'
         assert self.type is other.type, 'Only same type groups could be merged'
-        return Group(list(self) + other, name=self.name)
+        return Group._from_trusted(np.vstack((self._dc, other._dc)),
+                                   typ=self.type, name=self.name)
 
     def __pow__(self, other):
         """Return all mutual cross products of two ``Group`` objects
@@ -830,32 +952,76 @@ class Group(list):
     def __setitem__(self, key, value):
         assert isinstance(value, self.type), \
             'item is not of type %s' % self.type.__name__
-        super(Group, self).__setitem__(key, value)
+        if self._shared:
+            # copy on write data shared with sliced groups
+            self._dc = self._dc.copy()
+            self._buf = None
+            self._shared = False
+        self._dc[key] = value
+        self._stats = None
 
     def __getitem__(self, key):
         """Group fancy indexing"""
         if isinstance(key, slice):
-            key = np.arange(*key.indices(len(self)))
+            # slices are views sharing data
+            dc = self._dc[key]
+            assert dc.shape[0] > 0, 'Empty group is not allowed.'
+            self._shared = True
+            g = Group._from_trusted(dc, typ=self.type, name=self.name)
+            g._shared = True
+            return g
         if isinstance(key, list) or isinstance(key, tuple):
             key = np.asarray(key)
         if isinstance(key, np.ndarray):
-            if key.dtype == 'bool':
-                key = np.flatnonzero(key)
-            return Group([self[i] for i in key])
+            dc = self._dc[key]
+            assert dc.shape[0] > 0, 'Empty group is not allowed.'
+            return Group._from_trusted(dc, typ=self.type, name=self.name)
         else:
-            return super(Group, self).__getitem__(key)
+            return self._dc[key].copy().view(self.type)
+
+    def _reserve(self, m):
+        """Ensure spare capacity for `m` appended vectors. Capacity is
+        doubled when exhausted, so appends are amortized O(1)."""
+        n = len(self)
+        if self._buf is None or self._buf.shape[0] < n + m:
+            buf = np.empty((max(2 * n, n + m, 16), 3))
+            buf[:n] = self._dc
+            self._buf = buf
+            self._dc = buf[:n]
 
     def append(self, item):
         assert isinstance(item, self.type), \
             'item is not of type %s' % self.type.__name__
-        super(Group, self).append(item)
+        n = len(self)
+        self._reserve(1)
+        self._buf[n] = item
+        self._dc = self._buf[:n + 1]
+        self._stats = None
 
     def extend(self, items=()):
-        for item in items:
-            self.append(item)
+        if '_dc' not in self.__dict__:
+            # items of legacy pickle, see __setstate__
+            self.__dict__.setdefault('_items', []).extend(items)
+            return
+        if isinstance(items, Group):
+            assert items.type is self.type, \
+                'items are not of type %s' % self.type.__name__
+            dc = items._dc
+        else:
+            items = list(items)
+            for item in items:
+                assert isinstance(item, self.type), \
+                    'item is not of type %s' % self.type.__name__
+            dc = np.array(items, dtype=float).reshape(-1, 3)
+        if len(dc):
+            n = len(self)
+            self._reserve(len(dc))
+            self._buf[n:n + len(dc)] = dc
+            self._dc = self._buf[:n + len(dc)]
+            self._stats = None
 
     def copy(self):
-        return Group(super(Group, self).copy(), self.name)
+        return Group(self, self.name)
 
     @property
     def data(self):
@@ -863,9 +1029,48 @@ class Group(list):
         return list(self)
 
     @classmethod
-    def from_csv(cls, fname, typ=Lin, delimiter=',', acol=1, icol=2):
+    def from_dc(cls, dc, typ=Vec3, name='Default'):
+        """Create ``Group`` object from (N, 3) array of vectors
+
+        Args:
+          dc: array of vectors (e.g. direction cosines) with shape (N, 3)
+
+        Keyword Args:
+          typ: type of data. ``Vec3``, ``Fol`` or ``Lin``. Default ``Vec3``
+          name: name of ``Group`` object. Default is 'Default'
+
+        Example:
+          >>> g = Group.from_dc(np.random.randn(100, 3), typ=Lin)
+
+        """
+        assert issubclass(typ, Vec3), 'Data must be Fol, Lin or Vec3 type.'
+        dc = np.array(dc, dtype=float)
+        assert dc.ndim == 2 and dc.shape[1] == 3, 'Array must have shape (N, 3).'
+        assert dc.shape[0] > 0, 'Empty group is not allowed.'
+        return cls._from_trusted(dc, typ=typ, name=name)
+
+    @classmethod
+    def _from_trusted(cls, dc, typ=Vec3, name='Default'):
+        """Create ``Group`` from validated (N, 3) float array without
+        checks and copy. Used internally, when array is not referenced
+        elsewhere or is view of data of other group."""
+        g = cls.__new__(cls)
+        g._dc = dc
+        g._buf = None
+        g._shared = False
+        g._stats = None
+        g.type = typ
+        g.name = name
+        return g
+
+    @classmethod
+    def from_csv(cls, fname, typ=Lin, delimiter=',', acol=1, icol=2, **kwargs):
         """Create ``Group`` object from csv file
 
+        File is parsed in chunks and azimuths and inclinations of each
+        chunk are converted directly to array of direction cosines, so
+        only the selected columns of one chunk are held as text at once.
+
         Args:
           fname: csv filename
 
@@ -874,15 +1079,35 @@ class Group(list):
           delimiter (str): values delimiter. Default ','
           acol (int): azimuth column. Default 1
           icol (int): inclination column. Default 2
+          chunksize (int): number of rows parsed at once. Default 2**16
+          accumulator: ``OrtensorAccumulator`` to be updated by chunks
+            instead of creating ``Group``. Accumulator is returned.
+          progress: callable receiving number of rows read and fraction
+            of file read after each chunk, or True to print progress.
 
         Example:
           >>> g = Group.from_csv('file.csv', typ=Fol, acol=2, icol=3)
+          >>> acc = Group.from_csv('big.csv', accumulator=OrtensorAccumulator())
 
         """
         from os.path import basename
-        dt = np.loadtxt(fname, dtype=float, delimiter=delimiter).T
-        return cls.from_array(dt[acol - 1], dt[icol - 1],
-                              typ=typ, name=basename(fname))
+        acc = kwargs.get('accumulator', None)
+        g = None
+        for dt in _csv_chunks(fname, (acol - 1, icol - 1), delimiter,
+                              kwargs.get('chunksize', 2**16),
+                              kwargs.get('progress', None)):
+            chunk = cls.from_array(dt[:, 0], dt[:, 1],
+                                   typ=typ, name=basename(fname))
+            if acc is not None:
+                acc.update(chunk)
+            elif g is None:
+                g = chunk
+            else:
+                g.extend(chunk)
+        if acc is not None:
+            return acc
+        assert g is not None, 'Empty group is not allowed.'
+        return g
 
     def to_csv(self, fname, delimiter=',', rounded=False):
         """Save ``Group`` object to csv file
@@ -916,29 +1141,68 @@ class Group(list):
         Example:
           >>> f = Fault(140, 30, 110, 26, -1)
         """
-        data = []
-        data = [typ(azi, inc) for azi, inc in zip(azis, incs)]
-        return cls(data, name=name)
+        azis = np.asarray(azis, dtype=float)
+        incs = np.asarray(incs, dtype=float)
+        if issubclass(typ, Fol):
+            if settings['notation'] == 'rhr':
+                azis = azis + 90
+            dc = p2v(azis, incs)
+        else:
+            dc = l2v(azis, incs)
+        return cls.from_dc(dc.T, typ=typ, name=name)
 
     @property
     def aslin(self):
         """Return ``Group`` object with all data converted to ``Lin``."""
-        return Group([e.aslin for e in self], name=self.name)
+        return Group.from_dc(self._dc, typ=Lin, name=self.name)
 
     @property
     def asfol(self):
         """Return ``Group`` object with all data converted to ``Fol``."""
-        return Group([e.asfol for e in self], name=self.name)
+        return Group.from_dc(self._dc, typ=Fol, name=self.name)
 
     @property
     def asvec3(self):
         """Return ``Group`` object with all data converted to ``Vec3``."""
-        return Group([e.asvec3 for e in self], name=self.name)
+        return Group.from_dc(self._dc, typ=Vec3, name=self.name)
 
     @property
     def V(self):
         """Return ``Group`` object with all data converted to ``Vec3``."""
-        return Group([e.asvec3 for e in self], name=self.name)
+        return Group.from_dc(self._dc, typ=Vec3, name=self.name)
+
+    def _statistics(self):
+        """Return cached resultant based statistics of ``Group``.
+
+        Resultant, its length, spherical and total variance are computed
+        in single pass over data and stored until ``Group`` is modified.
+        For ``Lin`` and ``Fol`` vectors are oriented to the half-space
+        opposite to principal axis of orientation tensor before summing,
+        which is equivalent to vectorial summing of centered data.
+
+        """
+        if self._stats is not None and self._stats['type'] is self.type:
+            return self._stats
+        dc = self._dc
+        if self.type == Vec3:
+            r = np.sum(dc, axis=0)
+        elif self.type in (Lin, Fol):
+            _, _, u = np.linalg.svd(np.dot(dc.T, dc) / len(dc))
+            n = dc / np.linalg.norm(dc, axis=1)[:, None]
+            flip = np.dot(n, u[0]) > 0
+            r = np.sum(n, axis=0) - 2 * np.sum(n[flip], axis=0)
+        else:
+            raise TypeError('Wrong argument type! Only Vec3, Lin and Fol!')
+        R = np.linalg.norm(r)
+        res = np.dot(dc, r / R)
+        if self.type in (Lin, Fol):
+            res = np.abs(res)
+        self._stats = {'type': self.type,
+                       'R': r,
+                       'Rlen': R,
+                       'N': len(dc),
+                       'totvar': 1 - np.mean(res)}
+        return self._stats
 
     @property
     def R(self):
@@ -953,25 +1217,7 @@ class Group(list):
         As axial summing is not commutative we use vectorial summing of
         centered data for Fol and Lin
         """
-        if self.type == Vec3:
-            r = Vec3(np.sum(self, axis=0))
-        elif self.type == Lin:
-            _, _, u = np.linalg.svd(self.ortensor.cov)
-            # centered
-            cntr = self.transform(u).rotate(Lin(90, 0), 90)
-            # all points Z-ward
-            cg = Group.from_array(*cntr.dd, typ=Vec3)
-            r = cg.R.aslin.rotate(Lin(90, 0), -90).transform(u.T)
-        elif self.type == Fol:
-            _, _, u = np.linalg.svd(self.ortensor.cov)
-            # centered
-            cntr = self.transform(u).rotate(Lin(90, 0), 90)
-            # all points Z-ward
-            cg = Group.from_array(*cntr.aslin.dd, typ=Vec3)
-            r = cg.R.asfol.rotate(Lin(90, 0), -90).transform(u.T)
-        else:
-            raise TypeError('Wrong argument type! Only Vec3, Lin and Fol!')
-        return r
+        return self._statistics()['R'].copy().view(self.type)
 
     @property
     def var(self):
@@ -979,7 +1225,8 @@ class Group(list):
 
         var = 1 - |R| / n
         """
-        return 1 - abs(self.R) / len(self)
+        stats = self._statistics()
+        return 1 - stats['Rlen'] / stats['N']
 
     @property
     def totvar(self):
@@ -990,7 +1237,7 @@ class Group(list):
         Note that difference between totvar and var is measure of difference
         between sample and population mean
         """
-        return 1 - np.mean(self.dot(self.R.uv))
+        return self._statistics()['totvar']
 
     @property
     def fisher_stats(self):
@@ -999,19 +1246,22 @@ class Group(list):
         fisher_stats property returns dictionary with `k`, `csd` and
         `a95` keywords.
         """
-        stats = {'k': np.inf, 'a95': 180.0, 'csd': 0.0}
-        N = len(self)
-        R = abs(self.R)
-        if N != R:
-            stats['k'] = (N - 1) / (N - R)
-            stats['csd'] = 81 / np.sqrt(stats['k'])
-        stats['a95'] = acosd(1 - ((N - R) / R) * (20**(1 / (N - 1)) - 1))
-        return stats
+        stats = self._statistics()
+        if 'fisher' not in stats:
+            fisher = {'k': np.inf, 'a95': 180.0, 'csd': 0.0}
+            N, R = stats['N'], stats['Rlen']
+            if N != R:
+                fisher['k'] = (N - 1) / (N - R)
+                fisher['csd'] = 81 / np.sqrt(fisher['k'])
+            fisher['a95'] = acosd(1 - ((N - R) / R) * (20**(1 / (N - 1)) - 1))
+            stats['fisher'] = fisher
+        return dict(stats['fisher'])
 
     @property
     def delta(self):
         """Cone angle containing ~63% of the data in degrees."""
-        return acosd(abs(self.R) / len(self))
+        stats = self._statistics()
+        return acosd(stats['Rlen'] / stats['N'])
 
     @property
     def rdegree(self):
@@ -1019,35 +1269,44 @@ class Group(list):
 
         D = 100 * (2 * |R| - n) / n
         """
-        N = len(self)
-        return 100 * (2 * abs(self.R) - N) / N
+        stats = self._statistics()
+        N = stats['N']
+        return 100 * (2 * stats['Rlen'] - N) / N
 
-    def cross(self, other=None):
+    def cross(self, other=None, blocksize=2**20):
         """Return cross products of all data in ``Group`` object
 
         Without arguments it returns cross product of all pairs in dataset.
         If argument is group or single data object all mutual cross products
         are returned.
+
+        Keyword Args:
+          blocksize: maximum number of pairs evaluated at once when cross
+            products of all pairs are calculated. Default 2**20
         """
-        res = []
         if other is None:
-            for i in range(len(self) - 1):
-                for j in range(i + 1, len(self)):
-                    res.append(self[i]**self[j])
+            n = len(self)
+            res = np.empty((n * (n - 1) // 2, 3))
+            for sl, rows, cols, mask in self._pairblocks(blocksize):
+                res[sl] = np.cross(self._dc[rows, None, :],
+                                   self._dc[None, cols, :])[mask]
         elif isinstance(other, Group):
-            for e in self:
-                for f in other:
-                    res.append(e**f)
+            res = np.cross(self._dc[:, None, :], other._dc[None, :, :])
+            res = res.reshape(-1, 3)
         elif issubclass(type(other), Vec3):
-            for e in self:
-                res.append(e**other)
+            res = np.cross(self._dc, other)
         else:
             raise TypeError('Wrong argument type!')
-        return Group(res, name=self.name)
+        typ = {Lin: Fol, Fol: Lin}.get(self.type, Vec3)
+        return Group.from_dc(res, typ=typ, name=self.name)
 
     def rotate(self, axis, phi):
         """Rotate ``Group`` object `phi` degress about `axis`."""
-        return Group([e.rotate(axis, phi) for e in self], name=self.name)
+        k = axis.uv
+        dc = (cosd(phi) * self._dc +
+              sind(phi) * np.cross(k, self._dc) +
+              (1 - cosd(phi)) * np.outer(np.dot(self._dc, k), k))
+        return Group.from_dc(dc, typ=self.type, name=self.name)
 
     @property
     def centered(self):
@@ -1064,15 +1323,19 @@ class Group(list):
         """Change orientation of vectors in Group, so all have angle<=90 with
         resultant.
 
+        Vectors are first oriented towards principal axis of orientation
+        tensor, then all vectors antiparallel to resultant are flipped at
+        once until none remains. Each step increases length of resultant,
+        so iterations always converge.
+
         """
         v = self.asvec3
-        alldone = np.all(v.angle(v.R) <= 90)
-        while not alldone:
-            ang = v.angle(v.R)
-            for ix, do in enumerate(ang > 90):
-                if do:
-                    v[ix] = -v[ix]
-                alldone = np.all(v.angle(v.R) <= 90)
+        dc = v._dc
+        dc[np.dot(dc, self.ortensor.vects[0]) < 0] *= -1
+        flip = np.dot(dc, dc.sum(axis=0)) < 0
+        while np.any(flip):
+            dc[flip] *= -1
+            flip = np.dot(dc, dc.sum(axis=0)) < 0
         if self.type == Lin:
             v = v.aslin
         if self.type == Fol:
@@ -1082,42 +1345,84 @@ class Group(list):
     @property
     def uv(self):
         """Return ``Group`` object with normalized (unit length) elements."""
-        return Group([e.uv for e in self], name=self.name)
+        return Group.from_dc(self._dc / abs(self)[:, None],
+                             typ=self.type, name=self.name)
 
-    def angle(self, other=None):
+    def angle(self, other=None, out=None, dtype=float, blocksize=2**20):
         """Return angles of all data in ``Group`` object
 
         Without arguments it returns angles of all pairs in dataset.
         If argument is group or single data object all mutual angles
         are returned.
+
+        Angles of all pairs are returned as condensed distance vector (see
+        ``scipy.spatial.distance.squareform``) calculated by blocks of
+        matrix products, so memory needed for temporary arrays is bounded
+        by `blocksize`.
+
+        Keyword Args:
+          out: preallocated array of length n * (n - 1) / 2 to store angles
+            of all pairs. Default None
+          dtype: dtype of array of angles of all pairs when `out` is not
+            given. Use np.float32 to save memory. Default float
+          blocksize: maximum number of pairs evaluated at once. Default 2**20
         """
-        res = []
+        u = self.uv._dc
         if other is None:
-            for i in range(len(self) - 1):
-                for j in range(i + 1, len(self)):
-                    res.append(self[i].angle(self[j]))
+            n = len(self)
+            if out is None:
+                out = np.empty(n * (n - 1) // 2, dtype=dtype)
+            assert np.shape(out) == (n * (n - 1) // 2,), \
+                'Output array must have length %d' % (n * (n - 1) // 2)
+            for sl, rows, cols, mask in self._pairblocks(blocksize):
+                cs = np.dot(u[rows], u[cols].T)[mask]
+                if self.type in (Lin, Fol):
+                    cs = np.abs(cs)
+                out[sl] = acosd(np.clip(cs, -1, 1))
+            return out
         elif isinstance(other, Group):
-            for e in self:
-                for f in other:
-                    res.append(e.angle(f))
+            cs = np.dot(u, other.uv._dc.T).ravel()
         elif issubclass(type(other), Vec3):
-            for e in self:
-                res.append(e.angle(other))
+            cs = np.dot(u, other.uv)
         else:
             raise TypeError('Wrong argument type!')
-        return np.array(res)
+        if self.type in (Lin, Fol):
+            cs = np.abs(cs)
+        return acosd(np.clip(cs, -1, 1))
+
+    def _pairblocks(self, blocksize):
+        """Generator of blocks of all pairs of data for pairwise operations.
+
+        Each block covers consecutive rows of upper triangle of pairs matrix
+        and it is returned as tuple of slice of condensed vector, row indexes,
+        column indexes and mask of pairs above diagonal.
+        """
+        n = len(self)
+        step = max(1, int(blocksize) // max(1, n))
+        for i0 in range(0, n - 1, step):
+            i1 = min(i0 + step, n - 1)
+            rows = np.arange(i0, i1)
+            cols = np.arange(i0 + 1, n)
+            mask = cols[None, :] > rows[:, None]
+            start = i0 * n - i0 * (i0 + 1) // 2
+            stop = i1 * n - i1 * (i1 + 1) // 2
+            yield slice(start, stop), rows, cols, mask
 
     def proj(self, vec):
         """Return projections of all data in ``Group`` onto vector.
 
         """
-        return Group([e.proj(vec) for e in self], name=self.name)
+        dc = np.outer(np.dot(self._dc, vec), vec) / np.linalg.norm(vec)
+        return Group.from_dc(dc, typ=self.type, name=self.name)
 
     def dot(self, vec):
         """Return array of dot products of all data in ``Group`` with vector.
 
         """
-        return np.array([e.dot(vec) for e in self])
+        res = np.dot(self._dc, vec)
+        if self.type in (Lin, Fol):
+            res = np.abs(res)
+        return res
 
     @property
     def ortensor(self):
@@ -1136,20 +1441,32 @@ class Group(list):
           F: Transformation matrix. Should be array-like value e.g. ``DefGrad``
 
         """
-        return Group([e.transform(F) for e in self], name=self.name)
+        if self.type == Fol:
+            dc = np.dot(self._dc, np.linalg.inv(F))
+        else:
+            dc = np.dot(self._dc, np.transpose(F))
+        return Group.from_dc(dc, typ=self.type, name=self.name)
 
     @property
     def dd(self):
         """Return array of dip directions and dips of ``Group``"""
-        return np.array([d.dd for d in self]).T
+        if self.type == Lin:
+            return np.array(v2l(self._dc.T))
+        elif self.type == Fol:
+            return np.array(v2p(self._dc.T))
+        else:
+            n = self.uv._dc
+            return np.array([atan2d(n[:, 1], n[:, 0]) % 360, asind(n[:, 2])])
 
     @property
     def rhr(self):
         """Return array of strikes and dips of ``Group``"""
-        return np.array([d.rhr for d in self]).T
+        azi, inc = self.dd
+        return np.array([(azi - 90) % 360, inc])
 
     @classmethod
-    def randn_lin(cls, N=100, mean=Lin(0, 90), sig=20, name='Default'):
+    def randn_lin(cls, N=100, mean=Lin(0, 90), sig=20, name='Default',
+                  rng=None):
         """Method to create ``Group`` of normaly distributed random ``Lin`` objects.
 
         Keyword Args:
@@ -1157,6 +1474,8 @@ class Group(list):
           mean: mean orientation given as ``Lin``. Default Lin(0, 90)
           sig: sigma of normal distribution. Default 20
           name: name of dataset. Default is 'Default'
+          rng: ``numpy.random.Generator`` used to draw samples. Default None
+            (global numpy random state)
 
         Example:
           >>> g = Group.randn_lin(100, Lin(120, 40))
@@ -1164,14 +1483,13 @@ class Group(list):
           L:120/39
 
         """
-        data = []
         ta, td = mean.dd
-        for azi, dip in zip(180 * np.random.rand(N), sig * np.random.randn(N)):
-            data.append(Lin(0, 90).rotate(Lin(azi, 0), dip))
-        return cls(data, name=name).rotate(Lin(ta + 90, 0), 90 - td)
+        g = cls._randn(N, Lin(0, 90), sig, Lin, name, rng)
+        return g.rotate(Lin(ta + 90, 0), 90 - td)
 
     @classmethod
-    def randn_fol(cls, N=100, mean=Fol(0, 0), sig=20, name='Default'):
+    def randn_fol(cls, N=100, mean=Fol(0, 0), sig=20, name='Default',
+                  rng=None):
         """Method to create ``Group`` of normaly distributed random ``Fol`` objects.
 
         Keyword Args:
@@ -1179,6 +1497,8 @@ class Group(list):
           mean: mean orientation given as ``Fol``. Default Fol(0, 0)
           sig: sigma of normal distribution. Default 20
           name: name of dataset. Default is 'Default'
+          rng: ``numpy.random.Generator`` used to draw samples. Default None
+            (global numpy random state)
 
         Example:
           >>> g = Group.randn_fol(100, Lin(240, 60))
@@ -1186,11 +1506,25 @@ class Group(list):
           S:238/61
 
         """
-        data = []
         ta, td = mean.dd
-        for azi, dip in zip(180 * np.random.rand(N), sig * np.random.randn(N)):
-            data.append(Fol(0, 0).rotate(Lin(azi, 0), dip))
-        return cls(data, name=name).rotate(Lin(ta - 90, 0), td)
+        g = cls._randn(N, Fol(0, 0), sig, Fol, name, rng)
+        return g.rotate(Lin(ta - 90, 0), td)
+
+    @classmethod
+    def _randn(cls, N, e, sig, typ, name, rng):
+        """Rotate vector `e` about random horizontal axes by normally
+        distributed angles. Used by ``randn_lin`` and ``randn_fol``."""
+        if rng is None:
+            azi, phi = 180 * np.random.rand(N), sig * np.random.randn(N)
+        else:
+            azi, phi = 180 * rng.random(N), sig * rng.standard_normal(N)
+        e = np.asarray(e, dtype=float)
+        k = l2v(azi, np.zeros(N)).T
+        k /= np.linalg.norm(k, axis=1)[:, None]
+        dc = (cosd(phi)[:, None] * e +
+              sind(phi)[:, None] * np.cross(k, e) +
+              (1 - cosd(phi))[:, None] * k * np.dot(k, e)[:, None])
+        return cls.from_dc(dc, typ=typ, name=name)
 
     @classmethod
     def uniform_lin(cls, N=500, name='Default'):
@@ -1206,20 +1540,20 @@ class Group(list):
           array([ 0.3354383 ,  0.33228085,  0.33228085])
 
         """
-        n = 2 * np.ceil(np.sqrt(N) / 0.564)
-        azi = 0
-        inc = 90
-        for rho in np.linspace(0, 1, np.round(n / 2 / np.pi))[:-1]:
-            theta = np.linspace(0, 360, np.round(n * rho + 1))[:-1]
-            x, y = rho * sind(theta), rho * cosd(theta)
-            azi = np.hstack((azi, atan2d(x, y)))
-            ii = asind(np.sqrt((x * x + y * y) / 2))
-            inc = np.hstack((inc, 90 - 2 * ii))
+        n = int(2 * np.ceil(np.sqrt(N) / 0.564))
+        # concentric rings of nodes, ring with radius rho has n * rho nodes
+        rho = np.linspace(0, 1, int(np.round(n / 2 / np.pi)))[:-1]
+        cnt = np.round(n * rho + 1).astype(int) - 1
+        k = np.arange(cnt.sum()) - np.repeat(np.cumsum(cnt) - cnt, cnt)
+        theta = k * np.repeat(360 / np.maximum(cnt, 1), cnt)
+        rho = np.repeat(rho, cnt)
+        x, y = rho * sind(theta), rho * cosd(theta)
         # no antipodal
         theta = np.linspace(0, 360, n + 1)[:-1:2]
-        x, y = sind(theta), cosd(theta)
-        azi = np.hstack((azi, atan2d(x, y)))
-        inc = np.hstack((inc, 90 - 2 * asind(np.sqrt((x * x + y * y) / 2))))
+        x = np.hstack((0, x, sind(theta)))
+        y = np.hstack((0, y, cosd(theta)))
+        azi = atan2d(x, y)
+        inc = 90 - 2 * asind(np.sqrt((x * x + y * y) / 2))
         # fix
         inc[inc < 0] = 0
         return cls.from_array(azi, inc, typ=Lin, name=name)
@@ -1267,7 +1601,7 @@ class Group(list):
         sp = i2 / N
         cp = np.sqrt((N + i2) * (N - i2)) / N
         dc = np.array([cp * np.sin(theta), cp * np.cos(theta), sp]).T
-        return cls([Vec3(d) for d in dc], name=name)
+        return cls.from_dc(dc, typ=Vec3, name=name)
 
     @classmethod
     def sfs_lin(cls, N=500, name='Default'):
@@ -1283,9 +1617,9 @@ class Group(list):
           >>> g.ortensor.eigenvals
           array([ 0.33417707,  0.33333973,  0.33248319])
         """
-        g = cls.sfs_vec3(N=2 * N)
+        dc = cls.sfs_vec3(N=2 * N)._dc
         # no antipodal
-        return cls([d.aslin for d in g if d[2] > 0], name=name)
+        return cls.from_dc(dc[dc[:, 2] > 0], typ=Lin, name=name)
 
     @classmethod
     def sfs_fol(cls, N=500, name='Default'):
@@ -1301,9 +1635,9 @@ class Group(list):
           >>> g.ortensor.eigenvals
           array([ 0.33417707,  0.33333973,  0.33248319])
         """
-        g = cls.sfs_vec3(N=2 * N)
+        dc = cls.sfs_vec3(N=2 * N)._dc
         # no antipodal
-        return cls([d.asfol for d in g if d[2] > 0], name=name)
+        return cls.from_dc(dc[dc[:, 2] > 0], typ=Fol, name=name)
 
     @classmethod
     def gss_vec3(cls, N=1000, name='Default'):
@@ -1328,7 +1662,7 @@ class Group(list):
         r = np.sqrt(1 - y * y)
         phi = k * inc
         dc = np.array([np.cos(phi) * r, y, np.sin(phi) * r]).T
-        return cls([Vec3(d) for d in dc], name=name)
+        return cls.from_dc(dc, typ=Vec3, name=name)
 
     @classmethod
     def gss_lin(cls, N=500, name='Default'):
@@ -1344,9 +1678,9 @@ class Group(list):
           >>> g.ortensor.eigenvals
           array([ 0.33498373,  0.3333366 ,  0.33167967])
         """
-        g = cls.gss_vec3(N=2 * N)
+        dc = cls.gss_vec3(N=2 * N)._dc
         # no antipodal
-        return cls([d.aslin for d in g if d[2] > 0], name=name)
+        return cls.from_dc(dc[dc[:, 2] > 0], typ=Lin, name=name)
 
     @classmethod
     def gss_fol(cls, N=500, name='Default'):
@@ -1362,12 +1696,12 @@ class Group(list):
           >>> g.ortensor.eigenvals
           array([ 0.33498373,  0.3333366 ,  0.33167967])
         """
-        g = cls.gss_vec3(N=2 * N)
+        dc = cls.gss_vec3(N=2 * N)._dc
         # no antipodal
-        return cls([d.asfol for d in g if d[2] > 0], name=name)
+        return cls.from_dc(dc[dc[:, 2] > 0], typ=Fol, name=name)
 
     @classmethod
-    def kent_lin(cls, p, kappa=20, beta=0, N=500, name='Default'):
+    def kent_lin(cls, p, kappa=20, beta=0, N=500, name='Default', rng=None):
         """Method to create ``Group`` of ``Lin`` objects distributed
         according to Kent distribution (Kent, 1982) - The 5-parameter
         Fisher–Bingham distribution.
@@ -1378,6 +1712,8 @@ class Group(list):
           kappa: concentration parameter. Default 20
           beta: ellipticity 0 <= beta < kappa
           name: name of dataset. Default is 'Default'
+          rng: ``numpy.random.Generator`` used to draw samples. Default None
+            (global numpy random state)
 
         Example:
           >>> p = Pair(135, 30, 90, 22)
@@ -1385,8 +1721,25 @@ class Group(list):
         """
         assert issubclass(type(p), Pair), 'Argument must be Pair object.'
         k = KentDistribution(p.lvec, p.fvec.cross(p.lvec), p.fvec, kappa, beta)
-        g = Group([Vec3(v).aslin for v in k.rvs(N)])
-        return g
+        return cls.from_dc(k.rvs(N, rng=rng), typ=Lin, name=name)
+
+    def fit_kent(self, method='mle'):
+        """Return ``KentDistribution`` fitted to data.
+
+        ``Lin`` and ``Fol`` data are oriented to half-space of resultant
+        before fitting. Requires scipy.
+
+        Keyword Args:
+          method: 'mle' for maximum likelihood or 'me' for moment estimate.
+            Default 'mle'
+
+        Example:
+          >>> g = Group.kent_lin(Pair(135, 30, 90, 22), 30, 5, 300)
+          >>> g.fit_kent()
+
+        """
+        g = self.halfspace if self.type in (Lin, Fol) else self
+        return KentDistribution.fit(g.uv._dc, method=method)
 
     def to_file(self, filename='group.dat'):
         """Save group to file.
@@ -1412,6 +1765,43 @@ class Group(list):
         print('Group loaded from file %s' % filename)
         return cls(data, name=filename)
 
+    def to_npz(self, filename='group.npz'):
+        """Save group to binary ``.npz`` file.
+
+        Raw direction cosines are stored as single uncompressed array
+        together with type, name and notation, so file could be opened
+        by ``from_npz`` without deserialization of objects.
+
+        Keyword Args:
+          filename (str): name of file to save. Default 'group.npz'
+
+        Example:
+          >>> g = Group.randn_lin(100)
+          >>> g.to_npz('group.npz')
+
+        """
+        _save_npz(filename, dict(cls='Group', type=self.type.__name__,
+                                 name=self.name), dc=self._dc)
+
+    @classmethod
+    def from_npz(cls, filename='group.npz', mmap=True):
+        """Load group from binary ``.npz`` file created by ``to_npz``.
+
+        Keyword Args:
+          filename (str): name of data file to load. Default 'group.npz'
+          mmap (bool): memory-map data instead of reading them. Data are
+            paged in lazily and changes are not written to file.
+            Default True
+
+        Example:
+          >>> g = Group.from_npz('group.npz')
+
+        """
+        meta, arrays = _load_npz(filename, mmap=mmap)
+        assert meta['cls'] == 'Group', 'File does not contain Group.'
+        typ = {'Vec3': Vec3, 'Lin': Lin, 'Fol': Fol}[meta['type']]
+        return cls._from_trusted(arrays['dc'], typ=typ, name=meta['name'])
+
     def bootstrap(self, N=100, size=None):
         """Return iterator of bootstraped samples from ``Group``.
 
@@ -1433,6 +1823,64 @@ class Group(list):
         for ix in np.random.randint(0, len(self), (N, size)):
             yield self[ix]
 
+    def bootstrap_stats(self, N=1000, size=None, stats=('R', 'fisher'),
+                        seed=None, **kwargs):
+        """Return statistics of bootstraped samples from ``Group``.
+
+        Resample indices are drawn as single array for each block of
+        replicates and requested statistics are calculated for all
+        replicates in block at once. Blocks could be evaluated in parallel
+        processes. Each block has its own random stream spawned from
+        ``seed``, so the same ``seed`` and ``blocksize`` give the same
+        replicates regardless of number of processes.
+
+        Args:
+          N: number of samples to be generated. Default 1000
+          size: number of data in sample. Default is same as ``Group``.
+          stats: sequence of statistics to be calculated. Available are
+            'R' (resultant), 'fisher' (`k`, `csd` and `a95`) and
+            'eigenvals' (eigenvalues of orientation tensor).
+            Default ('R', 'fisher')
+          seed: seed for random generator. Default None
+
+        Keyword Args:
+          blocksize: number of replicates calculated at once.
+            Default so block contains about 2**20 vectors
+          processes: number of worker processes. Default 1
+
+        Returns dictionary with keys `R` (``Group`` of resultants),
+        `k`, `csd`, `a95` (arrays) and `eigenvals` ((N, 3) array)
+        according to requested statistics.
+
+        Example:
+          >>> g = Group.randn_lin(100, mean=Lin(120,40))
+          >>> bs = g.bootstrap_stats(10000, seed=42)
+          >>> bs['R'].fisher_stats
+
+        """
+        if size is None:
+            size = len(self)
+        for stat in stats:
+            assert stat in ('R', 'fisher', 'eigenvals'), \
+                'Unknown statistic %s' % stat
+        blocksize = int(kwargs.get('blocksize', max(1, 2**20 // size)))
+        processes = kwargs.get('processes', 1)
+        counts = [min(blocksize, N - start) for start in range(0, N, blocksize)]
+        seeds = np.random.SeedSequence(seed).spawn(len(counts))
+        axial = self.type in (Lin, Fol)
+        args = [[self._dc] * len(counts), [axial] * len(counts),
+                [size] * len(counts), counts, seeds, [tuple(stats)] * len(counts)]
+        if processes > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=processes) as pool:
+                res = list(pool.map(_bootstrap_chunk, *args))
+        else:
+            res = [_bootstrap_chunk(*arg) for arg in zip(*args)]
+        out = {key: np.concatenate([r[key] for r in res]) for key in res[0]}
+        if 'R' in out:
+            out['R'] = Group.from_dc(out['R'], typ=self.type, name=self.name)
+        return out
+
     @classmethod
     def examples(cls, name=None):
         """Create ``Group`` from example datasets. Available names are returned
@@ -1522,33 +1970,94 @@ class Group(list):
             return cls.from_array(azis[name], incs[name], typs[name], name=name)
 
 
-class PairSet(list):
+def _rotate_rows(v, k, phi):
+    """Rotate rows of (N, 3) array `v` about rows of unit axes `k` by `phi`
+    degrees. Rotation is clockwise along axis direction as ``Vec3.rotate``.
+    """
+    k = np.asarray(k)
+    phi = np.asarray(phi, dtype=float)[..., None]
+    return (cosd(phi) * v + sind(phi) * np.cross(k, v) +
+            (1 - cosd(phi)) * k * np.sum(k * v, axis=1)[:, None])
+
+
+def _adjust_pairs(fvec, lvec):
+    """Adjust (N, 3) arrays of unit normals and lineations, so lineations
+    fit exactly onto planes, the same way as ``Pair`` does. Returns
+    adjusted normals, lineations and array of misfit angles."""
+    dot = np.sum(fvec * lvec, axis=1)
+    misfit = 90 - acosd(np.clip(np.abs(dot), -1, 1))
+    if np.any(misfit > 20):
+        warnings.warn('Warning: Misfit angle is %.1f degrees.' % misfit.max())
+    ax = np.cross(fvec, lvec)
+    ax /= np.linalg.norm(ax, axis=1)[:, None]
+    ang = (acosd(np.clip(dot, -1, 1)) - 90) / 2
+    return _rotate_rows(fvec, ax, ang), _rotate_rows(lvec, ax, -ang), misfit
+
+
+def _fault_senses(fvec, lvec):
+    """Return array of senses of (N, 3) arrays of unit normals and
+    lineations as ``Fault.sense`` does. Sense is positive, when rotation
+    axis of vectors has same orientation as rotation axis of their lower
+    hemisphere counterparts."""
+    orax = np.cross(fvec, lvec)
+    rax = np.cross(fvec * np.where(fvec[:, 2] < 0, -1, 1)[:, None],
+                   lvec * np.where(lvec[:, 2] < 0, -1, 1)[:, None])
+    return np.where(np.einsum('ij,ij->i', orax, rax) < 0, -1, 1)
+
+
+class PairSet(object):
     """PairSet is homogeneous group of ``Pair`` objects
 
+    Planar and linear features are stored in two (N, 3) float arrays of
+    plane normals and lineation vectors together with array of misfits,
+    so all properties are evaluated as whole-array numpy expressions.
+    Indexing by integer still returns ``Pair`` object.
+
     """
     def __init__(self, data, name='Default'):
-        assert issubclass(type(data), list), 'Argument must be list of data.'
-        assert len(data) > 0, 'Empty PairSet is not allowed.'
-        tp = type(data[0])
-        assert issubclass(tp, Pair), 'Data must be of Pair type.'
-        assert all([isinstance(e, tp) for e in data]), \
-            'All data in PairSet must be of same type.'
-        super(PairSet, self).__init__(data)
+        if isinstance(data, PairSet):
+            fvec, lvec = data._fvec.copy(), data._lvec.copy()
+            misfit, tp = data._misfit.copy(), data.type
+        else:
+            assert issubclass(type(data), list), 'Argument must be list of data.'
+            assert len(data) > 0, 'Empty PairSet is not allowed.'
+            tp = type(data[0])
+            assert issubclass(tp, Pair), 'Data must be of Pair type.'
+            assert all([isinstance(e, tp) for e in data]), \
+                'All data in PairSet must be of same type.'
+            fvec = np.array([e.fvec for e in data], dtype=float)
+            lvec = np.array([e.lvec for e in data], dtype=float)
+            misfit = np.array([e.misfit for e in data], dtype=float)
+        self._fvec = fvec
+        self._lvec = lvec
+        self._misfit = misfit
         self.type = tp
         self.name = name
 
     def __repr__(self):
         return 'P:%g %s (%s)' % (len(self), self.type.__name__, self.name)
 
+    def __len__(self):
+        return self._fvec.shape[0]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._item(i)
+
     def __add__(self, other):
         # merge sets
         assert self.type is other.type, 'Only same type could be merged'
-        return PairSet(list(self) + other, name=self.name)
+        return type(self)._from_arrays(np.vstack((self._fvec, other._fvec)),
+                                       np.vstack((self._lvec, other._lvec)),
+                                       np.hstack((self._misfit, other._misfit)),
+                                       typ=self.type, name=self.name)
 
     def __setitem__(self, key, value):
         assert isinstance(value, self.type), \
             'item is not of type %s' % self.type.__name__
-        super(FaultSet, self).__setitem__(key, value)
+        self._fvec[key] = value.fvec
+        self._lvec[key] = value.lvec
+        self._misfit[key] = value.misfit
 
     def __getitem__(self, key):
         """PairSet fancy indexing"""
@@ -1559,36 +2068,130 @@ class PairSet(list):
         if isinstance(key, np.ndarray):
             if key.dtype == 'bool':
                 key = np.flatnonzero(key)
-            return type(self)([self[i] for i in key])
+            return type(self)._from_arrays(self._fvec[key], self._lvec[key],
+                                           self._misfit[key],
+                                           typ=self.type, name=self.name)
         else:
-            return super(type(self), self).__getitem__(key)
+            return self._item(key)
+
+    def _item(self, key):
+        # create item without adjustment of already adjusted vectors
+        item = self.type.__new__(self.type)
+        item.fvec = self._fvec[key].copy().view(Vec3)
+        item.lvec = self._lvec[key].copy().view(Vec3)
+        item.misfit = self._misfit[key]
+        return item
 
     def append(self, item):
         assert isinstance(item, self.type), \
             'item is not of type %s' % self.type.__name__
-        super(PairSet, self).append(item)
+        self._fvec = np.vstack((self._fvec, item.fvec))
+        self._lvec = np.vstack((self._lvec, item.lvec))
+        self._misfit = np.hstack((self._misfit, item.misfit))
 
     def extend(self, items=()):
+        items = list(items)
         for item in items:
-            self.append(item)
+            assert isinstance(item, self.type), \
+                'item is not of type %s' % self.type.__name__
+        if items:
+            self._fvec = np.vstack([self._fvec] + [e.fvec for e in items])
+            self._lvec = np.vstack([self._lvec] + [e.lvec for e in items])
+            self._misfit = np.hstack([self._misfit] + [e.misfit for e in items])
 
     @property
     def data(self):
         return list(self)
 
+    def to_npz(self, filename='pairs.npz'):
+        """Save set to binary ``.npz`` file.
+
+        Plane normals, lineation vectors and misfits are stored as
+        uncompressed arrays together with type, name and notation. Sense
+        of movement of faults is kept as orientation of lineation vectors.
+
+        Keyword Args:
+          filename (str): name of file to save. Default 'pairs.npz'
+
+        """
+        _save_npz(filename, dict(cls=type(self).__name__,
+                                 type=self.type.__name__, name=self.name),
+                  fvec=self._fvec, lvec=self._lvec, misfit=self._misfit)
+
+    @classmethod
+    def from_npz(cls, filename='pairs.npz', mmap=True):
+        """Load set from binary ``.npz`` file created by ``to_npz``.
+
+        Keyword Args:
+          filename (str): name of data file to load. Default 'pairs.npz'
+          mmap (bool): memory-map data instead of reading them. Data are
+            paged in lazily and changes are not written to file.
+            Default True
+
+        """
+        meta, arrays = _load_npz(filename, mmap=mmap)
+        assert meta['cls'] == cls.__name__, \
+            'File does not contain %s.' % cls.__name__
+        typ = {'Pair': Pair, 'Fault': Fault}[meta['type']]
+        ps = cls.__new__(cls)
+        ps._fvec = arrays['fvec']
+        ps._lvec = arrays['lvec']
+        ps._misfit = arrays['misfit']
+        ps.type = typ
+        ps.name = meta['name']
+        return ps
+
+    @classmethod
+    def _from_arrays(cls, fvec, lvec, misfit, typ=Pair, name='Default'):
+        """Create set from already adjusted arrays of vectors"""
+        ps = cls.__new__(cls)
+        ps._fvec = np.array(fvec, dtype=float)
+        ps._lvec = np.array(lvec, dtype=float)
+        ps._misfit = np.array(misfit, dtype=float)
+        assert ps._fvec.ndim == 2 and ps._fvec.shape[1] == 3, \
+            'Array must have shape (N, 3).'
+        assert ps._fvec.shape[0] > 0, 'Empty PairSet is not allowed.'
+        assert ps._fvec.shape == ps._lvec.shape == ps._misfit.shape + (3,), \
+            'Arrays must have same length.'
+        ps.type = typ
+        ps.name = name
+        return ps
+
     def rotate(self, axis, phi):
         """Rotate PairSet"""
-        return type(self)([f.rotate(axis, phi) for f in self], name=self.name)
+        k = np.tile(np.asarray(axis.uv), (len(self), 1))
+        return type(self)._from_arrays(_rotate_rows(self._fvec, k, phi),
+                                       _rotate_rows(self._lvec, k, phi),
+                                       self._misfit,
+                                       typ=self.type, name=self.name)
 
     @classmethod
     def from_csv(cls, fname, delimiter=',',
-                 facol=1, ficol=2, lacol=3, licol=4):
-        """Read PairSet from csv file"""
+                 facol=1, ficol=2, lacol=3, licol=4, **kwargs):
+        """Read PairSet from csv file
+
+        File is parsed in chunks of rows. Keyword arguments `chunksize`
+        and `progress` are same as for ``Group.from_csv``.
+        """
+        return cls._from_csv_cols(fname, (facol, ficol, lacol, licol),
+                                  delimiter, **kwargs)
+
+    @classmethod
+    def _from_csv_cols(cls, fname, cols, delimiter=',', **kwargs):
+        """Read set from chunks of csv file columns passed to from_array"""
         from os.path import basename
-        dt = np.loadtxt(fname, dtype=float, delimiter=delimiter).T
-        return cls.from_array(dt[facol - 1], dt[ficol - 1],
-                              dt[lacol - 1], dt[licol - 1],
-                              name=basename(fname))
+        parts = [cls.from_array(*dt.T, name=basename(fname))
+                 for dt in _csv_chunks(fname, tuple(c - 1 for c in cols),
+                                       delimiter,
+                                       kwargs.get('chunksize', 2**16),
+                                       kwargs.get('progress', None))]
+        assert parts, 'Empty %s is not allowed.' % cls.__name__
+        if len(parts) == 1:
+            return parts[0]
+        return cls._from_arrays(np.vstack([p._fvec for p in parts]),
+                                np.vstack([p._lvec for p in parts]),
+                                np.hstack([p._misfit for p in parts]),
+                                typ=parts[0].type, name=basename(fname))
 
     def to_csv(self, fname, delimiter=',', rounded=False):
         if rounded:
@@ -1602,64 +2205,71 @@ class PairSet(list):
     @classmethod
     def from_array(cls, fazis, fincs, lazis, lincs, name='Default'):
         """Create PairSet from arrays of dip directions and dips"""
-        data = []
-        for fazi, finc, lazi, linc in zip(fazis, fincs, lazis, lincs):
-            data.append(Pair(fazi, finc, lazi, linc))
-        return cls(data, name=name)
+        fvec = np.asarray(Group.from_array(fazis, fincs, typ=Fol))
+        lvec = np.asarray(Group.from_array(lazis, lincs, typ=Lin))
+        fvec, lvec, misfit = _adjust_pairs(fvec, lvec)
+        return cls._from_arrays(fvec, lvec, misfit, typ=Pair, name=name)
 
     @property
     def fol(self):
         """Return Fol part of PairSet as Group of Fol"""
-        return Group([e.fol for e in self], name=self.name)
+        return Group.from_dc(self._fvec, typ=Fol, name=self.name)
 
     @property
     def fvec(self):
         """Return vectors of Fol of PairSet as Group of Vec3"""
-        return Group([e.fvec for e in self], name=self.name)
+        return Group.from_dc(self._fvec, typ=Vec3, name=self.name)
 
     @property
     def lin(self):
         """Return Lin part of PairSet as Group of Lin"""
-        return Group([e.lin for e in self], name=self.name)
+        return Group.from_dc(self._lvec, typ=Lin, name=self.name)
 
     @property
     def lvec(self):
         """Return vectors of Lin part of PairSet as Group of Vec3"""
-        return Group([e.lvec for e in self], name=self.name)
+        return Group.from_dc(self._lvec, typ=Vec3, name=self.name)
+
+    @property
+    def rax(self):
+        """Return vectors perpendicular to both Fol and Lin as Group of Vec3"""
+        return Group.from_dc(np.cross(self._fvec, self._lvec),
+                             typ=Vec3, name=self.name)
 
     @property
     def misfit(self):
         """Return array of misfits"""
-        return np.array([f.misfit for f in self])
+        return self._misfit.copy()
 
 
 class FaultSet(PairSet):
     """FaultSet is homogeneous group of ``Fault`` objects
 
+    Sense of movement is stored as orientation of lineation vectors, so
+    kinematic axes and planes are evaluated for all faults at once.
+
     """
     def __init__(self, data, name='Default'):
-        assert issubclass(type(data), list), 'Argument must be list of data.'
-        assert len(data) > 0, 'Empty FaultSet is not allowed.'
-        tp = type(data[0])
-        assert issubclass(tp, Fault), 'Data must be of Fault type.'
-        assert all([isinstance(e, tp) for e in data]), \
-            'All data in FaultSet must be of same type.'
-        super(FaultSet, self).__init__(data)
-        self.type = tp
-        self.name = name
+        if not isinstance(data, FaultSet):
+            assert issubclass(type(data), list), 'Argument must be list of data.'
+            assert len(data) > 0, 'Empty FaultSet is not allowed.'
+            tp = type(data[0])
+            assert issubclass(tp, Fault), 'Data must be of Fault type.'
+        super(FaultSet, self).__init__(data, name=name)
 
     def __repr__(self):
         return 'F:%g %s (%s)' % (len(self), self.type.__name__, self.name)
 
     @classmethod
     def from_csv(cls, fname, delimiter=',',
-                 facol=1, ficol=2, lacol=3, licol=4, scol=5):
-        """Read FaultSet from csv file"""
-        from os.path import basename
-        dt = np.loadtxt(fname, dtype=float, delimiter=delimiter).T
-        return cls.from_array(dt[facol - 1], dt[ficol - 1],
-                              dt[lacol - 1], dt[licol - 1],
-                              dt[scol - 1], name=basename(fname))
+                 facol=1, ficol=2, lacol=3, licol=4, scol=5, **kwargs):
+        """Read FaultSet from csv file
+
+        File is parsed in chunks of rows. Keyword arguments `chunksize`
+        and `progress` are same as for ``Group.from_csv``.
+        """
+        return cls._from_csv_cols(fname, (facol, ficol, lacol, licol, scol),
+                                  delimiter, **kwargs)
 
     def to_csv(self, fname, delimiter=',', rounded=False):
         if rounded:
@@ -1674,75 +2284,140 @@ class FaultSet(PairSet):
     @classmethod
     def from_array(cls, fazis, fincs, lazis, lincs, senses, name='Default'):
         """Create dataset from arrays of dip directions and dips"""
-        data = []
-        for fazi, finc, lazi, linc, sense in zip(fazis, fincs, lazis, lincs, senses):
-            data.append(Fault(fazi, finc, lazi, linc, sense))
-        return cls(data, name=name)
+        senses = np.sign(np.asarray(senses, dtype=float))
+        assert np.all(senses != 0), \
+            'Sense parameter must be positive or negative'
+        fvec = np.asarray(Group.from_array(fazis, fincs, typ=Fol))
+        lvec = np.asarray(Group.from_array(lazis, lincs, typ=Lin))
+        fvec, lvec, misfit = _adjust_pairs(fvec, lvec)
+        return cls._from_arrays(fvec, senses[:, None] * lvec, misfit,
+                                typ=Fault, name=name)
+
+    @classmethod
+    def from_vecs(cls, fvec, lvec, name='Default'):
+        """Create ``FaultSet`` from (N, 3) arrays or groups of ortogonal
+        vectors. Sense of each fault is decided from orientation of vectors,
+        so it is same as ``Fault.sense`` of fault with normal `fvec` and
+        lineation `lvec`.
+
+        Args:
+          fvec: vectors normal to fault planes
+          lvec: vectors parallel to movement
+
+        """
+        fu = np.asarray(fvec, dtype=float)
+        lu = np.asarray(lvec, dtype=float)
+        fu = fu / np.linalg.norm(fu, axis=1)[:, None]
+        lu = lu / np.linalg.norm(lu, axis=1)[:, None]
+        senses = _fault_senses(fu, lu)
+        # plane normals and lineations are stored in lower hemisphere
+        fu = fu * np.where(fu[:, 2] < 0, -1, 1)[:, None]
+        lu = lu * np.where(lu[:, 2] < 0, -1, 1)[:, None]
+        fu, lu, misfit = _adjust_pairs(fu, lu)
+        return cls._from_arrays(fu, senses[:, None] * lu, misfit,
+                                typ=Fault, name=name)
 
     @property
     def sense(self):
         """Return array of sense values"""
-        return np.array([f.sense for f in self])
-
-    @property
-    def p(self):
-        """Return p-axes of FaultSet as Group of Lin"""
-        return Group([e.p for e in self], name=self.name + '-P')
+        return _fault_senses(self._fvec, self._lvec)
 
     @property
     def pvec(self):
         """Return p-axes of FaultSet as Group of Vec3"""
-        return Group([e.pvec for e in self], name=self.name)
+        rax = np.cross(self._fvec, self._lvec)
+        rax /= np.linalg.norm(rax, axis=1)[:, None]
+        return Group.from_dc(_rotate_rows(self._fvec, rax, -45),
+                             typ=Vec3, name=self.name)
 
     @property
     def tvec(self):
         """Return t-axes of FaultSet as Group of Vec3"""
-        return Group([e.tvec for e in self], name=self.name)
+        rax = np.cross(self._fvec, self._lvec)
+        rax /= np.linalg.norm(rax, axis=1)[:, None]
+        return Group.from_dc(_rotate_rows(self._fvec, rax, 45),
+                             typ=Vec3, name=self.name)
+
+    @property
+    def p(self):
+        """Return p-axes of FaultSet as Group of Lin"""
+        g = self.pvec.aslin
+        g.name = self.name + '-P'
+        return g
 
     @property
     def t(self):
         """Return t-axes of FaultSet as Group of Lin"""
-        return Group([e.t for e in self], name=self.name + '-T')
+        g = self.tvec.aslin
+        g.name = self.name + '-T'
+        return g
 
     @property
     def m(self):
         """Return m-planes of FaultSet as Group of Fol"""
-        return Group([e.m for e in self], name=self.name + '-M')
+        return Group.from_dc(np.cross(self._fvec, self._lvec),
+                             typ=Fol, name=self.name + '-M')
 
     @property
     def d(self):
         """Return dihedra planes of FaultSet as Group of Fol"""
-        return Group([e.d for e in self], name=self.name + '-D')
+        rax = np.cross(self._fvec, self._lvec)
+        return Group.from_dc(np.cross(rax, self._fvec),
+                             typ=Fol, name=self.name + '-D')
 
-    def angmech(self, method='classic'):
+    def stress_inversion(self, step=10, nphi=20, **kwargs):
+        """Invert faults for reduced stress tensor by grid search over
+        principal axes orientations and shape ratios.
+
+        See ``apsg.inversion.stress_inversion`` for arguments and returned
+        values.
+
+        Example:
+          >>> f = FaultSet.examples('MELE')
+          >>> res = f.stress_inversion(step=10, nphi=20)
+          >>> res['stress']
+
+        """
+        from .inversion import stress_inversion
+        return stress_inversion(self, step=step, nphi=nphi, **kwargs)
+
+    def angmech(self, method='classic', **kwargs):
         """Implementation of Angelier-Mechler dihedra method
 
+        Fault plane normals and slip vectors are stacked once and all grid
+        nodes are evaluated against all faults by chunks of matrix products.
+
         Args:
           method: 'probability' or 'classic'. Classic method assigns +/-1
           to individual positions, while 'probability' returns maximum
           likelihood estimate.
+
+        Keyword Args:
+          blocksize: maximum number of grid nodes - faults pairs evaluated
+            at once. Default 2**20
+          Other keyword arguments are passed to ``StereoGrid``.
         """
-        def angmech(dc, fs):
-            val = 0
-            for f in fs:
-                val += 2 * float(np.sign(dc.dot(f.fvec)) == np.sign(dc.dot(f.lvec))) - 1
-            return val
-
-        def angmech2(dc, fs):
-            val = 0
-            d = Vec3(dc).aslin
-            for f in fs:
-                s = 2 * float(np.sign(dc.dot(f.fvec)) == np.sign(dc.dot(f.lvec))) - 1
-                lprob = (1 - abs(45 - f.lin.angle(d)) / 45)
-                fprob = (1 - abs(45 - f.fol.angle(d)) / 45)
-                val += s * lprob * fprob
-            return val
-
-        d = StereoGrid()
+        blocksize = int(kwargs.pop('blocksize', 2**20))
+        fvec = np.asarray(self.fvec)
+        lvec = np.asarray(self.lvec)
         if method == 'probability':
-            d.apply_func(angmech2, self)
-        else:
-            d.apply_func(angmech, self)
+            fu = fvec / np.linalg.norm(fvec, axis=1)[:, None]
+            lu = lvec / np.linalg.norm(lvec, axis=1)[:, None]
+
+        d = StereoGrid(**kwargs)
+        nchunk = max(1, blocksize // len(self))
+        for start in range(0, d.n, nchunk):
+            dc = d.dcgrid[start:start + nchunk]
+            # round-off noise of nodes lying on planes is ignored
+            sf = np.sign(np.round(np.dot(dc, fvec.T), 12))
+            sl = np.sign(np.round(np.dot(dc, lvec.T), 12))
+            val = 2 * (sf == sl) - 1.0
+            if method == 'probability':
+                ang = acosd(np.clip(np.abs(np.dot(dc, lu.T)), -1, 1))
+                val *= 1 - np.abs(45 - ang) / 45
+                ang = acosd(np.clip(np.abs(np.dot(dc, fu.T)), -1, 1))
+                val *= 1 - np.abs(45 - ang) / 45
+            d.values[start:start + nchunk] = val.sum(axis=1)
         return d
 
     @classmethod
@@ -1831,15 +2506,83 @@ class Ortensor(object):
     """
     def __init__(self, d, **kwargs):
         assert isinstance(d, Group), 'Only group could be passed to Ortensor'
-        self.cov = np.dot(np.array(d).T, np.array(d)) / len(d)
-        self.name = d.name
+        dc = np.asarray(d)
+        self._init(np.dot(dc.T, dc) / len(d), d.name, **kwargs)
+
+    def _init(self, cov, name, **kwargs):
+        self.cov = cov
+        self.name = name
         vc, vv = np.linalg.eig(self.cov)
         ix = np.argsort(vc)[::-1]
         self.eigenvals = vc[ix]
         self.vects = vv.T[ix]
         self.scaled = kwargs.get('scaled', False)
 
+    @classmethod
+    def from_cov(cls, cov, name='Default', **kwargs):
+        """Create ``Ortensor`` object from orientation matrix
+
+        Args:
+          cov: (3, 3) orientation matrix, i.e. mean of outer products of data
+
+        Keyword Args:
+          name: name of ``Ortensor`` object. Default is 'Default'
+          scaled: eigenvectors scaled by eigenvalues. Default False
+
+        """
+        cov = np.array(cov, dtype=float)
+        assert cov.shape == (3, 3), 'Orientation matrix must have shape (3, 3).'
+        ot = cls.__new__(cls)
+        ot._init(cov, name, **kwargs)
+        return ot
+
+    @classmethod
+    def from_labels(cls, data, labels, name='Default', **kwargs):
+        """Create stacked ``Ortensor`` object for labelled data
+
+        Orientation matrices of all labels are calculated at once and
+        decomposed by single batched eigh call. Eigenvalues have shape
+        (M, 3), eigenvectors (M, 3, 3) and all shape parameters are
+        arrays of length M, where M is number of unique labels stored in
+        ``labels`` property. Stacked ``Ortensor`` could be directly plotted
+        by ``FabricPlot``.
+
+        Args:
+          data: ``Group`` or (N, 3) array of vectors
+          labels: array of N labels (e.g. site IDs)
+
+        Keyword Args:
+          name: name of ``Ortensor`` object. Default is 'Default'
+
+        Example:
+          >>> ot = Ortensor.from_labels(g, sites)
+          >>> FabricPlot().plot(ot)
+
+        """
+        dc = np.asarray(data, dtype=float)
+        assert dc.ndim == 2 and dc.shape[1] == 3, 'Array must have shape (N, 3).'
+        assert len(labels) == len(dc), 'Number of labels must match data.'
+        ulabels, inv = np.unique(labels, return_inverse=True)
+        inv = inv.reshape(-1)
+        w = (dc[:, :, None] * dc[:, None, :]).reshape(-1, 9)
+        count = np.bincount(inv, minlength=len(ulabels))
+        cov = np.column_stack([np.bincount(inv, weights=w[:, i],
+                                           minlength=len(ulabels))
+                               for i in range(9)])
+        cov = cov.reshape(-1, 3, 3) / count[:, None, None]
+        vc, vv = np.linalg.eigh(cov)
+        ot = cls.__new__(cls)
+        ot.cov = cov
+        ot.name = name
+        ot.labels = ulabels
+        ot.eigenvals = vc[:, ::-1]
+        ot.vects = np.swapaxes(vv, 1, 2)[:, ::-1]
+        ot.scaled = kwargs.get('scaled', False)
+        return ot
+
     def __repr__(self):
+        if self.eigenvals.ndim > 1:
+            return 'Ortensor: %s (%d tensors)' % (self.name, len(self.eigenvals))
         return 'Ortensor: %s Kind: %s\n' % (self.name, self.kind) + \
             '(E1:%.4g,E2:%.4g,E3:%.4g)\n' % tuple(self.eigenvals) + \
             str(self.cov)
@@ -1847,22 +2590,24 @@ class Ortensor(object):
     @property
     def E1(self):
         """Max eigenvalue"""
-        return self.eigenvals[0]
+        return self.eigenvals[..., 0][()]
 
     @property
     def E2(self):
         """Middle eigenvalue"""
-        return self.eigenvals[1]
+        return self.eigenvals[..., 1][()]
 
     @property
     def E3(self):
         """Min eigenvalue"""
-        return self.eigenvals[2]
+        return self.eigenvals[..., 2][()]
 
     @property
     def eigenvects(self):
         """Return group of eigenvectors. If scaled property is True their
         length is scaled by eigenvalues, otherwise with unit length."""
+        assert self.eigenvals.ndim == 1, \
+            'Use vects property of stacked Ortensor.'
         if self.scaled:
             e1, e2, e3 = self.eigenvals
         else:
@@ -1899,17 +2644,17 @@ class Ortensor(object):
     @property
     def P(self):
         """Point index - Vollmer, 1990"""
-        return self.eigenvals[0] - self.eigenvals[1]
+        return self.E1 - self.E2
 
     @property
     def G(self):
         """Girdle index - Vollmer, 1990"""
-        return 2 * (self.eigenvals[1] - self.eigenvals[2])
+        return 2 * (self.E2 - self.E3)
 
     @property
     def R(self):
         """Random index - Vollmer, 1990"""
-        return 3 * self.eigenvals[2]
+        return 3 * self.E3
 
     @property
     def B(self):
@@ -1919,11 +2664,13 @@ class Ortensor(object):
     @property
     def I(self):
         """Intensity index - Lisle, 1985"""
-        return 7.5 * np.sum((self.eigenvals - 1 / 3)**2)
+        return 7.5 * np.sum((self.eigenvals - 1 / 3)**2, axis=-1)
 
     @property
     def kind(self):
         """Return descriptive type of ellipsoid"""
+        if self.eigenvals.ndim > 1:
+            return np.where(self.shape > 1, 'prolate', 'oblate')
         return {False: 'oblate', True: 'prolate'}[self.shape > 1]
 
     @property
@@ -1939,18 +2686,231 @@ class Ortensor(object):
     @property
     def MAD(self):
         """Return approximate deviation according to shape"""
+        if self.eigenvals.ndim > 1:
+            return np.where(self.shape > 1, self.MADp, self.MADo)
         if self.shape > 1:
             return self.MADp
         else:
             return self.MADo
 
 
+class OrtensorAccumulator(object):
+    """Streaming accumulator of orientation tensor and resultant.
+
+    Data could be added in chunks and accumulators filled by independent
+    workers could be merged, so ``Ortensor`` and Fisher statistics could
+    be calculated without keeping all data in memory. Only number of data
+    and sum of outer products (plus sum of vectors for ``Vec3`` data) are
+    stored, so results do not depend on order of updates and merges.
+
+    For ``Lin`` and ``Fol`` data principal axis and resultant are derived
+    lazily from summed scatter matrix. Resultant is principal axis with
+    length sqrt(n * E1), where E1 is largest eigenvalue of orientation
+    tensor, i.e. root mean square of cosines to principal axis is used
+    instead of mean of absolute cosines used by ``Group.R``.
+
+    Keyword Args:
+      typ: type of data. ``Vec3``, ``Fol`` or ``Lin``. Default ``Lin``
+      name: name of accumulator. Default is 'Default'
+
+    Example:
+      >>> acc = OrtensorAccumulator(typ=Fol)
+      >>> for azi, inc in chunks:
+      ...     acc.update_array(azi, inc)
+      >>> acc.ortensor.eigenvals
+      >>> acc.fisher_stats
+
+    """
+    def __init__(self, typ=Lin, name='Default'):
+        assert issubclass(typ, Vec3), 'Data must be Fol, Lin or Vec3 type.'
+        self.type = typ
+        self.name = name
+        self.n = 0
+        self.tensor = np.zeros((3, 3))
+        self.resultant = np.zeros(3)
+
+    def __repr__(self):
+        return 'OrtensorAccumulator: %s %s (%d data)' % \
+            (self.name, self.type.__name__, self.n)
+
+    def __len__(self):
+        return self.n
+
+    def __add__(self, other):
+        res = OrtensorAccumulator(typ=self.type, name=self.name)
+        res.merge(self)
+        res.merge(other)
+        return res
+
+    def update(self, d):
+        """Add data to accumulator
+
+        Args:
+          d: ``Group`` or (N, 3) array of vectors (e.g. direction cosines)
+
+        """
+        if isinstance(d, Group):
+            assert d.type is self.type, \
+                'Group type must be %s' % self.type.__name__
+        dc = np.asarray(d, dtype=float).reshape(-1, 3)
+        if len(dc) == 0:
+            return self
+        self.tensor += np.dot(dc.T, dc)
+        if self.type is Vec3:
+            self.resultant += dc.sum(axis=0)
+        self.n += len(dc)
+        return self
+
+    def update_array(self, azis, incs):
+        """Add data to accumulator from arrays of dip directions and dips
+
+        Args:
+          azis: list or array of dip directions
+          incs: list or array of inclinations
+
+        """
+        typ = Lin if self.type is Vec3 else self.type
+        return self.update(Group.from_array(azis, incs, typ=typ)._dc)
+
+    def merge(self, other):
+        """Merge other accumulator of same type into this one."""
+        assert isinstance(other, OrtensorAccumulator), \
+            'Only OrtensorAccumulator could be merged'
+        assert other.type is self.type, \
+            'Only same type accumulators could be merged'
+        self.tensor += other.tensor
+        self.resultant += other.resultant
+        self.n += other.n
+        return self
+
+    @property
+    def ortensor(self):
+        """Return ``Ortensor`` of accumulated data."""
+        assert self.n > 0, 'No data accumulated.'
+        return Ortensor.from_cov(self.tensor / self.n, name=self.name)
+
+    @property
+    def axis(self):
+        """Return principal axis of accumulated data as unit vector
+        pointing to lower hemisphere."""
+        assert self.n > 0, 'No data accumulated.'
+        _, vv = np.linalg.eigh(self.tensor)
+        axis = vv[:, -1]
+        return -axis if axis[2] < 0 else axis
+
+    @property
+    def R(self):
+        """Return resultant of accumulated data."""
+        if self.type is Vec3:
+            return self.resultant.copy().view(Vec3)
+        assert self.n > 0, 'No data accumulated.'
+        e1 = np.linalg.eigvalsh(self.tensor)[-1]
+        return (np.sqrt(self.n * max(e1, 0)) * self.axis).view(self.type)
+
+    @property
+    def var(self):
+        """Spherical variance based on resultant length (Mardia 1972)."""
+        return 1 - abs(self.R) / self.n
+
+    @property
+    def fisher_stats(self):
+        """Fisher's statistics.
+
+        fisher_stats property returns dictionary with `k`, `csd` and
+        `a95` keywords.
+        """
+        stats = {'k': np.inf, 'a95': 180.0, 'csd': 0.0}
+        N = self.n
+        R = abs(self.R)
+        if N != R:
+            stats['k'] = (N - 1) / (N - R)
+            stats['csd'] = 81 / np.sqrt(stats['k'])
+        stats['a95'] = acosd(1 - ((N - R) / R) * (20**(1 / (N - 1)) - 1))
+        return stats
+
+
+@lru_cache(maxsize=32)
+def _stereogrid_geometry(grid, npoints):
+    """Return read-only counting grid coordinates, direction cosines of
+    grid nodes and triangulation for given grid type and number of points.
+
+    Results are cached, use ``StereoGrid.clear_cache`` to release them.
+    """
+    import matplotlib.tri as tri
+    if grid == 'radial':
+        ctn_points = int(np.round(np.sqrt(npoints) / 0.280269786))
+        # calc grid as concentric rings of nodes around center
+        rho = np.linspace(0, 1, int(np.round(ctn_points / 2 / np.pi)))
+        cnt = np.round(ctn_points * rho + 1).astype(int) - 1
+        # index of node within its ring
+        k = np.arange(cnt.sum()) - np.repeat(np.cumsum(cnt) - cnt, cnt)
+        theta = k * np.repeat(360 / np.maximum(cnt, 1), cnt)
+        rho = np.repeat(rho, cnt)
+        xg = np.hstack((0, rho * sind(theta)))
+        yg = np.hstack((0, rho * cosd(theta)))
+    elif grid == 'ortho':
+        n = int(np.round(np.sqrt(npoints - 4) / 0.8685725142))
+        x, y = np.meshgrid(np.linspace(-1, 1, n), np.linspace(-1, 1, n))
+        d2 = (x**2 + y**2) <= 1
+        xg = np.hstack((0, 1, 0, -1, x[d2]))
+        yg = np.hstack((1, 0, -1, 0, y[d2]))
+    else:
+        raise TypeError('Wrong grid type!')
+    dcgrid = l2v(*getldd(xg, yg)).T
+    for arr in (xg, yg, dcgrid):
+        arr.flags.writeable = False
+    return xg, yg, dcgrid, tri.Triangulation(xg, yg)
+
+
+def _bootstrap_chunk(dc, axial, size, count, seed, stats):
+    """Calculate statistics of block of replicates for ``Group.bootstrap_stats``"""
+    rng = np.random.default_rng(seed)
+    sample = dc[rng.integers(0, len(dc), (count, size))]
+    res = {}
+    if axial or 'eigenvals' in stats:
+        cov = np.einsum('bni,bnj->bij', sample, sample) / size
+        vals, vects = np.linalg.eigh(cov)
+        if 'eigenvals' in stats:
+            res['eigenvals'] = vals[:, ::-1]
+    if 'R' in stats or 'fisher' in stats:
+        if axial:
+            n = sample / np.linalg.norm(sample, axis=2)[:, :, None]
+            flip = np.einsum('bni,bi->bn', n, vects[:, :, -1]) > 0
+            r = n.sum(axis=1) - 2 * np.einsum('bn,bni->bi', flip, n)
+        else:
+            r = sample.sum(axis=1)
+        if 'R' in stats:
+            res['R'] = r
+        if 'fisher' in stats:
+            R = np.linalg.norm(r, axis=1)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                k = np.where(R != size, (size - 1) / (size - R), np.inf)
+                res['k'] = k
+                res['csd'] = np.where(R != size, 81 / np.sqrt(k), 0.0)
+                res['a95'] = acosd(1 - ((size - R) / R) *
+                                   (20**(1 / (size - 1)) - 1))
+    return res
+
+
+def _apply_chunk(func, dc, scalar, args, kwargs):
+    """Evaluate function on chunk of grid nodes for ``StereoGrid.apply_batch``"""
+    if scalar:
+        return np.array([func(v, *args, **kwargs) for v in dc], dtype=float)
+    else:
+        return np.asarray(func(dc, *args, **kwargs), dtype=float).reshape(-1)
+
+
 class StereoGrid(object):
     """Class to store regular grid of values to be contoured on ``StereoNet``.
 
     ``StereoGrid`` object could be calculated from ``Group`` object or by user-
     defined function, which accept unit vector as argument.
 
+    Counting grid geometry (read-only coordinates, direction cosines and
+    triangulation) is cached and shared by all ``StereoGrid`` objects with
+    same `grid` and `npoints` options. Use ``StereoGrid.clear_cache()`` to
+    release cached grids.
+
     Args:
       g: ``Group`` object of data to be used for desity calculation. If
       ommited, zero values grid is returned.
@@ -1963,6 +2923,11 @@ class StereoGrid(object):
         Default 'exp_kamb'
       trim: Set negative values to zero. Default False
       weighted: use euclidean norms as weights. Default False
+      blocksize: maximum number of grid nodes - data pairs evaluated at
+        once during density calculation. Default 2**20
+      workers: number of threads used for density calculation. Default 1
+      neighbours: count only neighbour data for kernels with finite
+        support. Default True
 
     """
     def __init__(self, d=None, **kwargs):
@@ -1972,40 +2937,45 @@ class StereoGrid(object):
             self.calculate_density(np.asarray(d), **kwargs)
 
     def initgrid(self, **kwargs):
-        import matplotlib.tri as tri
         # parse options
         grid = kwargs.get('grid', 'radial')
-        if grid == 'radial':
-            ctn_points = int(np.round(np.sqrt(kwargs.get('npoints', 1800)) / 0.280269786))
-            # calc grid
-            self.xg = 0
-            self.yg = 0
-            for rho in np.linspace(0, 1, np.round(ctn_points / 2 / np.pi)):
-                theta = np.linspace(0, 360, np.round(ctn_points * rho + 1))[:-1]
-                self.xg = np.hstack((self.xg, rho * sind(theta)))
-                self.yg = np.hstack((self.yg, rho * cosd(theta)))
-        elif grid == 'ortho':
-            n = int(np.round(np.sqrt(kwargs.get('npoints', 1800) - 4) / 0.8685725142))
-            x, y = np.meshgrid(np.linspace(-1, 1, n), np.linspace(-1, 1, n))
-            d2 = (x**2 + y**2) <= 1
-            self.xg = np.hstack((0, 1, 0, -1, x[d2]))
-            self.yg = np.hstack((1, 0, -1, 0, y[d2]))
-        else:
-            raise TypeError('Wrong grid type!')
-        self.dcgrid = l2v(*getldd(self.xg, self.yg)).T
+        npoints = kwargs.get('npoints', 1800)
+        # grid geometry is shared by all instances with same grid options
+        self.xg, self.yg, self.dcgrid, self.triang = \
+            _stereogrid_geometry(grid, npoints)
         self.n = self.dcgrid.shape[0]
-        self.values = np.zeros(self.n, dtype=np.float)
-        self.triang = tri.Triangulation(self.xg, self.yg)
+        self.values = np.zeros(self.n, dtype=float)
+
+    @staticmethod
+    def clear_cache():
+        """Clear cache of counting grids shared by ``StereoGrid`` objects."""
+        _stereogrid_geometry.cache_clear()
 
     def calculate_density(self, dcdata, **kwargs):
         """Calculate density of elements from ``Group`` object.
 
+        Density is evaluated by tiles of matrix product of grid nodes and
+        data, so memory needed for temporary arrays is bounded by
+        `blocksize` even for very large datasets. Tiles could be evaluated
+        in parallel threads.
+
+        Keyword Args:
+          blocksize: maximum number of grid nodes - data pairs evaluated
+            at once. Default 2**20
+          workers: number of threads used to evaluate tiles. Default 1
+          neighbours: use KD-tree index of data, so kernels with finite
+            support ('kamb', 'linear_kamb', 'square_kamb') visit only data
+            inside cone around each node. Requires scipy. Default True
+
         """
         # parse options
         sigma = kwargs.get('sigma', 1./len(dcdata)**(-1./7))
         weighted = kwargs.get('weighted', False)
         method = kwargs.get('method', 'exp_kamb')
         trim = kwargs.get('trim', False)
+        blocksize = int(kwargs.get('blocksize', 2**20))
+        workers = kwargs.get('workers', 1)
+        neighbours = kwargs.get('neighbours', True)
 
         func = {'linear_kamb': _linear_inverse_kamb,
                 'square_kamb': _square_inverse_kamb,
@@ -2015,16 +2985,60 @@ class StereoGrid(object):
                 }[method]
 
         # weights are given by euclidean norms of data
+        ndata = len(dcdata)
         if weighted:
             weights = np.linalg.norm(dcdata, axis=1)
             weights /= weights.mean()
         else:
-            weights = np.ones(len(dcdata))
-        for i in range(self.n):
-            dist = np.abs(np.dot(self.dcgrid[i], dcdata.T))
-            count, scale = func(dist, sigma)
-            count *= weights
-            self.values[i] = (count.sum() - 0.5) / scale
+            weights = np.ones(ndata)
+        # kernels with finite support count only data within cone around
+        # nodes, when cone is small enough to make spatial index worthwhile
+        if neighbours and method in ('kamb', 'linear_kamb', 'square_kamb'):
+            norms = np.linalg.norm(dcdata, axis=1)
+            norms[norms == 0] = 1
+            # cone of unit vectors is widened for longer vectors
+            radius = _kamb_radius(ndata, sigma) / norms.max()
+            if radius > 0.95:
+                try:
+                    index = AxialIndex(dcdata / norms[:, None])
+                except ImportError:
+                    # scipy is not available, use matrix product engine
+                    index = None
+                if index is not None:
+                    # expected number of pairs per node is ndata * (1 - radius)
+                    nchunk = max(1, int(blocksize // (ndata * (1 - radius) + 1)))
+                    for start in range(0, self.n, nchunk):
+                        nodes = self.dcgrid[start:start + nchunk]
+                        inode, idata = index.neighbours(nodes, radius)
+                        dist = np.abs(np.sum(nodes[inode] * dcdata[idata], axis=1))
+                        count, scale = func(dist, sigma, n=ndata)
+                        count_sum = np.bincount(inode, weights=count * weights[idata],
+                                                minlength=len(nodes))
+                        self.values[start:start + nchunk] = (count_sum - 0.5) / scale
+                    if trim:
+                        self.values[self.values < 0] = 0
+                    return
+        # tiles are formed by chunks of grid nodes and chunks of data
+        dchunk = min(ndata, max(1, blocksize))
+        nchunk = max(1, blocksize // dchunk)
+
+        def tile(start):
+            nodes = self.dcgrid[start:start + nchunk]
+            count_sum = np.zeros(len(nodes))
+            for d0 in range(0, ndata, dchunk):
+                dist = np.dot(nodes, np.transpose(dcdata[d0:d0 + dchunk]))
+                count, scale = func(np.abs(dist, out=dist), sigma, n=ndata)
+                count_sum += np.dot(count, weights[d0:d0 + dchunk])
+            self.values[start:start + nchunk] = (count_sum - 0.5) / scale
+
+        starts = range(0, self.n, nchunk)
+        if workers > 1:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(tile, starts))
+        else:
+            for start in starts:
+                tile(start)
         if trim:
             self.values[self.values < 0] = 0
 
@@ -2037,6 +3051,72 @@ class StereoGrid(object):
         for i in range(self.n):
             self.values[i] = func(self.dcgrid[i], *args, **kwargs)
 
+    def apply_batch(self, func, *args, **kwargs):
+        """Calculate values using vectorized function passed as argument.
+        Function must accept (n, 3) array of grid nodes as argument and
+        return n values. Grid is passed to function in chunks, which could
+        be evaluated in parallel processes.
+
+        Keyword Args:
+          blocksize: maximum number of grid nodes passed to function at once.
+            Default all nodes or four chunks per process.
+          processes: number of worker processes. Function and its arguments
+            must be picklable. Default 1
+          scalar: function accepts single vector and returns scalar value as
+            in ``apply_func``. It is called node by node within chunks.
+            Default False
+
+        Other arguments and keyword arguments are passed to function.
+
+        Example:
+          >>> d = StereoGrid()
+          >>> d.apply_batch(lambda dc: np.abs(dc[:, 2]))
+
+        """
+        blocksize = kwargs.pop('blocksize', None)
+        processes = kwargs.pop('processes', 1)
+        scalar = kwargs.pop('scalar', False)
+        if blocksize is None:
+            blocksize = -(-self.n // (4 * processes)) if processes > 1 else self.n
+        starts = range(0, self.n, int(blocksize))
+        chunks = [self.dcgrid[start:start + int(blocksize)] for start in starts]
+        if processes > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=processes) as pool:
+                res = list(pool.map(_apply_chunk, [func] * len(chunks), chunks,
+                                    [scalar] * len(chunks), [args] * len(chunks),
+                                    [kwargs] * len(chunks)))
+        else:
+            res = (_apply_chunk(func, dc, scalar, args, kwargs) for dc in chunks)
+        for start, dc, val in zip(starts, chunks, res):
+            assert val.shape == (len(dc),), \
+                'Function must return one value for each grid node.'
+            self.values[start:start + len(dc)] = val
+
+    def apply_pdf(self, dist, axial=True, normalize=True):
+        """Calculate values as probability density function of distribution
+        evaluated on all grid nodes at once.
+
+        Args:
+          dist: distribution object with vectorized ``pdf`` method accepting
+            (n, 3) array of unit vectors, e.g. ``KentDistribution``
+
+        Keyword Args:
+          axial: when True, density of axial data f(x) + f(-x) is
+            calculated. Default True
+          normalize: normalize density. Default True
+
+        Example:
+          >>> p = Pair(135, 30, 90, 22)
+          >>> k = KentDistribution(p.lvec, p.fvec.cross(p.lvec), p.fvec, 30, 5)
+          >>> d = StereoGrid()
+          >>> d.apply_pdf(k)
+
+        """
+        self.values = dist.pdf(self.dcgrid, normalize=normalize)
+        if axial:
+            self.values = self.values + dist.pdf(-self.dcgrid, normalize=normalize)
+
     def contourf(self, *args, **kwargs):
         """ Show filled contours of values."""
         plt.figure()
@@ -2061,18 +3141,113 @@ class StereoGrid(object):
         plt.show()
 
 
+def _kmeans(g, k, maxiter=100, tol=1e-2, blocksize=2**16, seed=None):
+    """Spherical or axial k-means of ``Group`` used by ``Cluster``.
+
+    Vec3 centroids are normalized resultants of clusters, while Fol and Lin
+    centroids are principal eigenvectors of clusters orientation tensors.
+    Data are processed in blocks, so memory is bounded by ``blocksize`` * k.
+    Iterations stop when fraction of relabeled data is not above ``tol``.
+
+    Returns labels of data and ``Group`` of centroids.
+    """
+    axial = g.type in (Lin, Fol)
+    dc = g.uv._dc
+    n = len(dc)
+    k = min(int(k), n)
+    rng = np.random.default_rng(seed)
+    starts = range(0, n, blocksize)
+
+    def similarity(dc, cntr):
+        cs = np.dot(dc, cntr.T)
+        return np.abs(cs) if axial else cs
+
+    # k-means++ initialization on angular distance
+    cntr = np.empty((k, 3))
+    cntr[0] = dc[rng.integers(n)]
+    dist = np.full(n, np.inf)
+    for i in range(1, k):
+        for st in starts:
+            d = 1 - similarity(dc[st:st + blocksize], cntr[i - 1:i])[:, 0]
+            np.minimum(dist[st:st + blocksize], d, out=dist[st:st + blocksize])
+        p = np.clip(dist, 0, None)
+        cntr[i] = dc[rng.choice(n, p=p / p.sum())] if p.sum() > 0 \
+            else dc[rng.integers(n)]
+    labels = np.full(n, -1)
+    for _ in range(maxiter):
+        changed = 0
+        acc = np.zeros((k, 9 if axial else 3))
+        for st in starts:
+            chunk = dc[st:st + blocksize]
+            lab = np.argmax(similarity(chunk, cntr), axis=1)
+            changed += np.count_nonzero(lab != labels[st:st + blocksize])
+            labels[st:st + blocksize] = lab
+            if axial:
+                w = (chunk[:, :, None] * chunk[:, None, :]).reshape(-1, 9)
+            else:
+                w = chunk
+            for col in range(w.shape[1]):
+                acc[:, col] += np.bincount(lab, weights=w[:, col], minlength=k)
+        nonempty = np.bincount(labels, minlength=k) > 0
+        if axial:
+            _, vects = np.linalg.eigh(acc.reshape(-1, 3, 3))
+            new = vects[:, :, -1]
+        else:
+            norm = np.linalg.norm(acc, axis=1)
+            nonempty &= norm > 0
+            new = acc / np.where(norm > 0, norm, 1)[:, None]
+        cntr[nonempty] = new[nonempty]
+        if changed <= tol * n:
+            break
+    return labels, Group.from_dc(cntr, typ=g.type, name=g.name)
+
+
 class Cluster(object):
     """Cluster provides hierarchical clustering using scipy.cluster routines.
 
     Distance matrix is calculated as angle beetween features, where Fol and
-    Lin use axial angles while Vec3 uses direction angles."""
+    Lin use axial angles while Vec3 uses direction angles.
+
+    For large datasets ``kmeans`` keyword could be used. Data are first
+    partitioned by spherical (Vec3) or axial (Fol and Lin) k-means into given
+    number of centroids and hierarchical clustering is done on centroids
+    only, so memory is bounded by number of centroids instead of number
+    of data.
+
+    Keyword Args:
+      maxclust: number of clusters. Default 2
+      angle: maximum cophenetic distance(angle) in clusters. Default None
+      method: linkage method. Default 'average'
+      kmeans: number of k-means centroids. Default None (no k-means)
+      maxiter: maximum number of k-means iterations. Default 100
+      tol: k-means stops when fraction of relabeled data is not above tol.
+        Default 1e-2
+      blocksize: number of data processed at once by k-means. Default 2**16
+      seed: seed for k-means initialization. Default None
+
+    Example:
+      >>> g = Group.randn_lin(100000, mean=Lin(120,40))
+      >>> c = Cluster(g + Group.randn_lin(100000, mean=Lin(300,10)), kmeans=200)
+      >>> c.cluster(maxclust=2)
+      >>> c.R
+    """
     def __init__(self, d, **kwargs):
         assert isinstance(d, Group), 'Only group could be clustered'
-        self.data = Group(d.copy())
+        self.data = d.copy()
         self.maxclust = kwargs.get('maxclust', 2)
         self.angle = kwargs.get('angle', None)
         self.method = kwargs.get('method', 'average')
-        self.pdist = self.data.angle()
+        self.kmeans = kwargs.get('kmeans', None)
+        if self.kmeans is not None:
+            self.labels, self.centroids = _kmeans(
+                self.data, self.kmeans,
+                maxiter=kwargs.get('maxiter', 100),
+                tol=kwargs.get('tol', 1e-2),
+                blocksize=kwargs.get('blocksize', 2**16),
+                seed=kwargs.get('seed', None))
+            self.pdist = self.centroids.angle()
+        else:
+            self.pdist = self.data.angle()
         self.linkage()
 
     def __repr__(self):
@@ -2084,6 +3259,8 @@ class Cluster(object):
             crit = 'Criterion: Angle\nSettings: angle=%.4g\n' % (self.angle)
         else:
             crit = 'Criterion: Maxclust\nSettings: muxclust=%.4g\n' % (self.maxclust)
+        if self.kmeans is not None:
+            crit += 'K-means centroids: %d\n' % len(self.centroids)
         return 'Clustering object\n' + \
                'Number of data: %d\n' % len(self.data) + \
                'Linkage method: %s\n' % self.method + \
@@ -2106,6 +3283,8 @@ class Cluster(object):
             self.idx = fcluster(self.Z, self.angle, criterion='distance')
         else:
             self.idx = fcluster(self.Z, self.maxclust, criterion='maxclust')
+        if self.kmeans is not None:
+            self.idx = self.idx[self.labels]
         self.groups = tuple(self.data[np.flatnonzero(self.idx == c)]
                             for c in np.unique(self.idx))
 
@@ -2134,24 +3313,74 @@ class Cluster(object):
         """Plot within groups variance vs. number of clusters.
 
         Elbow criterion could be used to determine number of clusters.
+        Linkage tree is walked once from the root and at each step only
+        variances of two newly split clusters are calculated from cumulative
+        sums of data ordered by dendrogram leaves.
+
+        Keyword Args:
+          no_plot: when True, variances are returned instead of plot.
+            Default False
+          n: maximum number of clusters. Default sqrt(n/2), where n is
+            number of clustered items (or k-means centroids).
+
+        Returns tuple of list of number of clusters and list of lists of
+        within group variances, when ``no_plot`` is True.
         """
-        from scipy.cluster.hierarchy import fcluster
-        import matplotlib.pyplot as plt
+        from scipy.cluster.hierarchy import leaves_list
+        nleaves = len(self.Z) + 1
         if n is None:
-            idx = fcluster(self.Z, len(self.data), criterion='maxclust')
-            nclust = list(np.arange(1, np.sqrt(idx.max() / 2) + 1, dtype=int))
+            n = int(np.ceil(np.sqrt(nleaves / 2)))
+        nclust = list(range(1, min(n, nleaves) + 1))
+        # data sorted by dendrogram leaves, so each node is contiguous range
+        order = leaves_list(self.Z)
+        pos = np.empty(nleaves, dtype=int)
+        pos[order] = np.arange(nleaves)
+        if self.kmeans is not None:
+            labels = self.labels
+        else:
+            labels = np.arange(nleaves)
+        dc = self.data._dc[np.argsort(pos[labels], kind='stable')]
+        bounds = np.concatenate(
+            ([0], np.cumsum(np.bincount(labels, minlength=nleaves)[order])))
+        axial = self.data.type in (Lin, Fol)
+        if axial:
+            uv = dc / np.linalg.norm(dc, axis=1)[:, None]
+            csum = (dc[:, :, None] * dc[:, None, :]).cumsum(axis=0)
         else:
-            nclust = list(np.arange(1, n + 1, dtype=int))
-        within_grp_var = []
-        mean_var = []
-        for n in nclust:
-            idx = fcluster(self.Z, n, criterion='maxclust')
-            grp = [np.flatnonzero(idx == c) for c in np.unique(idx)]
-            # between_grp_var = Group([self.data[ix].R.uv for ix in grp]).var
-            var = [100 * self.data[ix].var for ix in grp]
-            within_grp_var.append(var)
-            mean_var.append(np.mean(var))
+            csum = dc.cumsum(axis=0)
+        csum = np.concatenate((np.zeros((1,) + csum.shape[1:]), csum))
+
+        def nodevar(lo, hi):
+            lo, hi = bounds[lo], bounds[hi]
+            if axial:
+                _, vects = np.linalg.eigh(csum[hi] - csum[lo])
+                u = uv[lo:hi]
+                flip = np.dot(u, vects[:, -1]) > 0
+                r = u.sum(axis=0) - 2 * u[flip].sum(axis=0)
+            else:
+                r = csum[hi] - csum[lo]
+            return 100 * (1 - np.linalg.norm(r) / (hi - lo))
+
+        def size(node):
+            return 1 if node < nleaves else int(self.Z[node - nleaves, 3])
+
+        root = 2 * nleaves - 2
+        ranges = {root: (0, nleaves)}
+        current = {root: nodevar(0, nleaves)}
+        within_grp_var = [list(current.values())]
+        for k in nclust[1:]:
+            node = 2 * nleaves - k
+            lo, hi = ranges.pop(node)
+            del current[node]
+            left, right = (int(c) for c in self.Z[node - nleaves, :2])
+            mid = lo + size(left)
+            ranges[left], ranges[right] = (lo, mid), (mid, hi)
+            current[left] = nodevar(lo, mid)
+            current[right] = nodevar(mid, hi)
+            within_grp_var.append(list(current.values()))
         if not no_plot:
+            import matplotlib.pyplot as plt
+            mean_var = [np.mean(var) for var in within_grp_var]
             plt.boxplot(within_grp_var, positions=nclust)
             plt.plot(nclust, mean_var, 'k')
             plt.xlabel('Number of clusters')
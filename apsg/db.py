@@ -5,41 +5,121 @@ API to read data from PySDB database
 """
 
 import sqlite3
+import threading
+import numpy as np
 from .core import Fol, Lin, Group
 
 __all__ = ['SDB']
 
 
 class SDB(object):
-    """PySDB database access class"""
-    _SELECT = """SELECT sites.name as name, sites.x_coord as x,
+    """PySDB database access class
+
+    Each thread gets its own connection from per-instance pool, so several
+    databases could be open at once and ``SDB`` could be used from worker
+    threads. Lists of structures, sites, units and tags are cached and
+    cache is invalidated whenever database is changed.
+
+    Args:
+      db: filename of PySDB database
+
+    Keyword Args:
+      cached_statements: number of prepared statements cached by each
+        connection. Default 128
+
+    Example:
+      >>> db = SDB('data.sdb')
+      >>> db.structures()
+
+    """
+    _COLUMNS = """SELECT sites.name as name, sites.x_coord as x,
     sites.y_coord as y, units.name as unit, structdata.azimuth as azimuth,
     structdata.inclination as inclination, structype.structure as structure,
     structype.planar as planar, structdata.description as description,
-    GROUP_CONCAT(tags.name) AS tags
+    GROUP_CONCAT(tags.name) AS tags"""
+    _FROM = """
     FROM structdata
     INNER JOIN sites ON structdata.id_sites=sites.id
     INNER JOIN structype ON structype.id = structdata.id_structype
     INNER JOIN units ON units.id = sites.id_units
     LEFT OUTER JOIN tagged ON structdata.id = tagged.id_structdata
     LEFT OUTER JOIN tags ON tags.id = tagged.id_tags"""
+    _SELECT = _COLUMNS + _FROM
+    _KEYS = {'structure': 'structype.structure', 'site': 'sites.name',
+             'unit': 'units.name', 'tag': 'tags.name'}
+    _INDEXES = [('structdata', 'id_structype'), ('structdata', 'id_sites'),
+                ('sites', 'id_units'), ('sites', 'name'),
+                ('structype', 'structure'), ('units', 'name'),
+                ('tagged', 'id_structdata'), ('tagged', 'id_tags'),
+                ('tags', 'name')]
 
-    def __new__(cls, db=None):
-        cls.conn = sqlite3.connect(db)
-        cls.conn.row_factory = sqlite3.Row
-        cls.conn.execute("pragma encoding='UTF-8'")
-        cls.conn.execute(SDB._SELECT + " LIMIT 1")
-        return super(SDB, cls).__new__(cls)
+    def __init__(self, db=None, **kwargs):
+        self.db = db
+        self._cached_statements = kwargs.get('cached_statements', 128)
+        self._local = threading.local()
+        self._pool = []
+        self._lock = threading.Lock()
+        self.conn.execute(SDB._SELECT + " LIMIT 1")
 
     def __repr__(self):
         return 'PySDB database version: {}'.format(self.meta('version'))
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def conn(self):
+        """Return connection of calling thread"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # connection is used only by its thread, but could be closed
+            # from any thread
+            conn = sqlite3.connect(self.db, check_same_thread=False,
+                                   cached_statements=self._cached_statements)
+            conn.row_factory = sqlite3.Row
+            conn.execute("pragma encoding='UTF-8'")
+            with self._lock:
+                self._pool.append(conn)
+            self._local.conn = conn
+            self._local.cache = {}
+            self._local.version = None
+        return conn
+
+    def close(self):
+        """Close all connections of all threads"""
+        with self._lock:
+            for conn in self._pool:
+                conn.close()
+            self._pool = []
+        self._local = threading.local()
+
+    def _cached(self, key, func):
+        """Return cached result of `func`. Cache of calling thread is
+        invalidated when database is changed by any connection."""
+        conn = self.conn
+        version = (conn.execute('PRAGMA data_version').fetchone()[0],
+                   conn.total_changes)
+        if version != self._local.version:
+            self._local.cache = {}
+            self._local.version = version
+        if key not in self._local.cache:
+            self._local.cache[key] = func()
+        return self._local.cache[key]
+
+    def clear_cache(self):
+        """Clear cache of metadata lists of calling thread"""
+        self._local.cache = {}
+
     def meta(self, name):
-        if name == 'crs':
-            val = self.conn.execute("SELECT value FROM meta WHERE name='crs'").fetchall()
-            if not val:
-                name = 'proj4'
-        return self.conn.execute("SELECT value FROM meta WHERE name='{}'".format(name)).fetchall()[0][0]
+        def query():
+            val = self.execsql("SELECT value FROM meta WHERE name=?", (name,))
+            if not val and name == 'crs':
+                val = self.execsql("SELECT value FROM meta WHERE name='proj4'")
+            return val[0][0]
+        return self._cached(('meta', name), query)
 
     def info(self, verbose=False):
         print('PySDB database version: {}'.format(self.meta('version')))
@@ -49,80 +129,149 @@ class SDB(object):
         print('Number of sites: {}'.format(len(self.sites())))
         print('Number of units: {}'.format(len(self.units())))
         print('Number of structures: {}'.format(len(self.structures())))
-        r = self.execsql(self._make_select())
-        print('Number of measurements: {}'.format(len(r)))
+        counts = self.counts()
+        print('Number of measurements: {}'.format(sum(counts.values())))
         if verbose:
-            for s in self.structures():
-                r = self.execsql(self._make_select(structs=s))
-                print('   Number of {} measurements: {}'.format(s, len(r)))
-
-    def _make_select(self, structs=None, sites=None, units=None, tags=None):
-        w = []
-        if structs:
-            if isinstance(structs, str):
-                w.append("structype.structure='%s'" % structs)
-            elif isinstance(structs, (list, tuple)):
-                u = ' OR '.join(["structype.structure='%s'" % struct
-                                 for struct in structs])
-                w.append("(" + u + ")")
-            else:
-                raise ValueError('Keyword structs must be list or string.')
-        if sites:
-            if isinstance(sites, str):
-                w.append("sites.name='%s'" % sites)
-            elif isinstance(sites, (list, tuple)):
-                u = ' OR '.join(["sites.name='%s'" % site for site in sites])
-                w.append("(" + u + ")")
-            else:
-                raise ValueError('Keyword sites must be list or string.')
-        if units:
-            if isinstance(units, str):
-                w.append("unit='%s'" % units)
-            elif isinstance(units, (list, tuple)):
-                u = ' OR '.join(["unit='%s'" % unit for unit in units])
-                w.append("(" + u + ")")
-            else:
-                raise ValueError('Keyword units must be list or string.')
+            for s, n in counts.items():
+                print('   Number of {} measurements: {}'.format(s, n))
+
+    def _make_where(self, structs=None, sites=None, units=None, tags=None):
+        w, params = [], []
+        for col, vals, kw in (('structype.structure', structs, 'structs'),
+                              ('sites.name', sites, 'sites'),
+                              ('units.name', units, 'units')):
+            if vals:
+                if isinstance(vals, str):
+                    vals = [vals]
+                elif not isinstance(vals, (list, tuple)):
+                    raise ValueError('Keyword %s must be list or string.' % kw)
+                w.append("%s IN (%s)" % (col, ','.join('?' * len(vals))))
+                params.extend(vals)
         if tags:
             if isinstance(tags, str):
-                w.append("tags.name like '%%%s%%'" % tags)
-            elif isinstance(tags, (list, tuple)):
-                u = ' AND '.join(["tags.name like '%%%s%%'" % tag
-                                  for tag in tags])
-                w.append("(" + u + ")")
-            else:
+                tags = [tags]
+            elif not isinstance(tags, (list, tuple)):
                 raise ValueError('Keyword tags must be list or string.')
-        sel = SDB._SELECT
+            w.append("(" + ' AND '.join(["tags.name like ?"] * len(tags)) + ")")
+            params.extend(['%' + tag + '%' for tag in tags])
         if w:
-            sel += " WHERE " + ' AND '.join(w) + " GROUP BY structdata.id"
-        else:
-            sel += " GROUP BY structdata.id"
-        return sel
+            return " WHERE " + ' AND '.join(w), params
+        return "", params
 
-    def execsql(self, sql):
-        return self.conn.execute(sql).fetchall()
+    def _make_select(self, **kwargs):
+        where, params = self._make_where(**kwargs)
+        return SDB._SELECT + where + " GROUP BY structdata.id", params
+
+    def _distinct(self, column, **kwargs):
+        where, params = self._make_where(**kwargs)
+        sql = "SELECT DISTINCT %s" % column + SDB._FROM + where
+        return [el[0] for el in self.execsql(sql, params) if el[0] is not None]
+
+    def execsql(self, sql, params=()):
+        return self.conn.execute(sql, params).fetchall()
+
+    def counts(self, **kwargs):
+        """Return dictionary of numbers of measurements of structures in
+        data. For kwargs see group method."""
+        def query():
+            where, params = self._make_where(**kwargs)
+            sql = ("SELECT structype.structure, COUNT(DISTINCT structdata.id)" +
+                   SDB._FROM + where + " GROUP BY structype.structure")
+            return dict((el[0], el[1]) for el in self.execsql(sql, params))
+        return dict(self._cached(('counts', repr(sorted(kwargs.items()))), query))
 
     def structures(self, **kwargs):
         """Return list of structures in data. For kwargs see group method."""
-        dtsel = self._make_select(**kwargs)
-        return list(set([el['structure'] for el in self.execsql(dtsel)]))
+        return list(self._cached(('structures', repr(sorted(kwargs.items()))),
+                                 lambda: self._distinct('structype.structure', **kwargs)))
 
     def sites(self, **kwargs):
         """Return list of sites in data. For kwargs see group method."""
-        dtsel = self._make_select(**kwargs)
-        return list(set([el['name'] for el in self.execsql(dtsel)]))
+        return list(self._cached(('sites', repr(sorted(kwargs.items()))),
+                                 lambda: self._distinct('sites.name', **kwargs)))
 
     def units(self, **kwargs):
         """Return list of units in data. For kwargs see group method."""
-        dtsel = self._make_select(**kwargs)
-        return list(set([el['unit'] for el in self.execsql(dtsel)]))
+        return list(self._cached(('units', repr(sorted(kwargs.items()))),
+                                 lambda: self._distinct('units.name', **kwargs)))
 
     def tags(self, **kwargs):
         """Return list of tags in data. For kwargs see group method."""
-        dtsel = self._make_select(**kwargs)
-        tags = [el['tags'] for el in self.execsql(dtsel)
-                if el['tags'] is not None]
-        return list(set(','.join(tags).split(',')))
+        return list(self._cached(('tags', repr(sorted(kwargs.items()))),
+                                 lambda: self._distinct('tags.name', **kwargs)))
+
+    def create_indexes(self):
+        """Create recommended indexes on PySDB tables to speed up joins
+        and filtering. Existing indexes are kept."""
+        for table, column in SDB._INDEXES:
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_{0}_{1} "
+                              "ON {0} ({1})".format(table, column))
+        self.conn.commit()
+
+    def groups(self, by='structure', **kwargs):
+        """Method to retrieve data from SDB database to many apsg.Group
+        objects at once
+
+        All data are fetched by single query ordered by partitioning keys
+        and azimuths and inclinations are converted to arrays, so groups
+        are created without objects for individual rows. Measurement with
+        more tags belongs to group of each of its tags.
+
+        Args:
+          by: 'structure', 'site', 'unit', 'tag' or tuple of them used to
+            partition data. Default 'structure'
+        Kwargs:
+          structs: name or list of names of structures to retrieve
+          sites: name or list of names of sites to retrieve from
+          units: name or list of names of units to retrieve from
+          tags:  tag or list of tags to retrieve
+
+        Returns:
+          dictionary of ``Group`` objects. Planar and linear structures or
+          different structures are never merged, so structure is always
+          last partitioning key. Keys are structure names when `by` is
+          'structure', otherwise tuples of values of `by` followed by
+          structure name, when structure is not in `by`.
+
+        Example:
+          >>> gs = db.groups('site', units='HG')
+          >>> gs['PB1', 'S1']
+
+        """
+        keys = (by,) if isinstance(by, str) else tuple(by)
+        for key in keys:
+            if key not in SDB._KEYS:
+                raise ValueError('Keyword by must be one of %s.' % ', '.join(SDB._KEYS))
+        if 'structure' not in keys:
+            keys += ('structure',)
+        cols = [SDB._KEYS[key] for key in keys]
+        where, params = self._make_where(**kwargs)
+        sql = ("SELECT DISTINCT structdata.id, structype.planar, "
+               "structdata.azimuth, structdata.inclination, " + ', '.join(cols) +
+               SDB._FROM + where + " ORDER BY " + ', '.join(cols) + ", structdata.id")
+        cur = self.conn.cursor()
+        cur.row_factory = None
+        rows = cur.execute(sql, params).fetchall()
+        res = {}
+        if not rows:
+            return res
+        dt = list(zip(*rows))
+        planar = np.array(dt[1], dtype=bool)
+        azis = np.array(dt[2], dtype=float)
+        incs = np.array(dt[3], dtype=float)
+        kv = np.empty((len(rows), len(keys)), dtype=object)
+        for i in range(len(keys)):
+            kv[:, i] = dt[4 + i]
+        # rows are ordered by keys, so groups are contiguous and each group
+        # contains single structure
+        bounds = np.flatnonzero(np.any(kv[1:] != kv[:-1], axis=1)) + 1
+        for start, end in zip(np.r_[0, bounds], np.r_[bounds, len(rows)]):
+            typ = Fol if planar[start] else Lin
+            key = tuple(kv[start])
+            name = '-'.join(str(k) for k in key)
+            res[key if len(keys) > 1 else key[0]] = Group.from_array(
+                azis[start:end], incs[start:end], typ=typ, name=name)
+        return res
 
     def group(self, struct, **kwargs):
         """Method to retrieve data from SDB database to apsg.Group
@@ -138,13 +287,6 @@ class SDB(object):
           >>> g = db.group('L2', units=['HG', 'MG'], tags='bos')
 
         """
-        dtsel = self._make_select(structs=struct, **kwargs)
-        tpsel = "SELECT planar FROM structype WHERE structure='{}'".format(struct)
-        tp = self.execsql(tpsel)[0][0]
-        if tp:
-            res = Group([Fol(el['azimuth'], el['inclination'])
-                         for el in self.execsql(dtsel)], name=struct)
-        else:
-            res = Group([Lin(el['azimuth'], el['inclination'])
-                         for el in self.execsql(dtsel)], name=struct)
-        return res
+        res = self.groups('structure', structs=struct, **kwargs)
+        assert struct in res, 'Empty group is not allowed.'
+        return res[struct]
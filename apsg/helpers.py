@@ -1,14 +1,8 @@
 # -*- coding: utf-8 -*-
 
 from __future__ import division
+from functools import lru_cache
 import numpy as np
-"""
-from scipy.stats import uniform
-from scipy.special import gamma as gamma_fun
-from scipy.special import iv as modified_bessel_2ndkind 
-from scipy.special import ivp as modified_bessel_2ndkind_derivative
-from scipy.stats import norm as gauss
-"""
 
 def sind(x):
     return np.sin(np.deg2rad(x))
@@ -91,6 +85,38 @@ def rodrigues(k, v, theta):
 def angle_metric(u, v):
     return np.degrees(np.arccos(np.abs(np.dot(u, v))))
 
+
+class AxialIndex(object):
+    """Spatial index of axial unit vectors.
+
+    Data are indexed by KD-tree together with their antipodes, so both
+    polarities of axial data are found by single ball query. Requires scipy.
+
+    Args:
+      data: (N, 3) array of unit vectors
+    """
+    def __init__(self, data):
+        from scipy.spatial import cKDTree
+        data = np.asarray(data, dtype=float)
+        self.n = len(data)
+        self.tree = cKDTree(np.vstack((data, -data)))
+
+    def neighbours(self, nodes, cos_radius):
+        """Find all pairs of unit vectors from `nodes` and indexed data with
+        absolute value of cosine distance >= `cos_radius` (0 < cos_radius <= 1).
+
+        Returns:
+          tuple of arrays of node indexes and data indexes of pairs. Pairs
+          close to cone boundary could be included, so exact distances
+          should be checked by caller.
+        """
+        from scipy.spatial import cKDTree
+        ntree = cKDTree(np.asarray(nodes, dtype=float))
+        # chord distance slightly enlarged to not miss pairs on boundary
+        r = np.sqrt(max(2 - 2 * cos_radius, 0)) * (1 + 1e-9) + 1e-12
+        pairs = ntree.sparse_distance_matrix(self.tree, r, output_type='ndarray')
+        return pairs['i'], pairs['j'] % self.n
+
 # ----------------------------------------------------------------
 # Following counting routines are from Joe Kington's mplstereonet
 # https://github.com/joferkington/mplstereonet
@@ -108,19 +134,23 @@ def _kamb_units(n, radius):
 
 
 # All of the following kernel functions return an _unsummed_ distribution and
-# a normalization factor
-def _exponential_kamb(cos_dist, sigma=3):
+# a normalization factor. Kernels accept cosine distances of data to single
+# node (1D array) or to several nodes (2D array with data along last axis).
+# Number of data `n` could be given explicitly when only chunk of data is
+# passed.
+def _exponential_kamb(cos_dist, sigma=3, n=None):
     """Kernel function from Vollmer for exponential smoothing."""
-    n = float(cos_dist.size)
+    n = float(cos_dist.shape[-1] if n is None else n)
     f = 2 * (1.0 + n / sigma**2)
-    count = np.exp(f * (cos_dist - 1))
+    # exponent is bounded to avoid slow underflow to denormal numbers
+    count = np.exp(np.maximum(f * (cos_dist - 1), -700))
     units = np.sqrt(n * (f / 2.0 - 1) / f**2)
     return count, units
 
 
-def _linear_inverse_kamb(cos_dist, sigma=3):
+def _linear_inverse_kamb(cos_dist, sigma=3, n=None):
     """Kernel function from Vollmer for linear smoothing."""
-    n = float(cos_dist.size)
+    n = float(cos_dist.shape[-1] if n is None else n)
     radius = _kamb_radius(n, sigma)
     f = 2 / (1 - radius)
     # cos_dist = cos_dist[cos_dist >= radius]
@@ -129,9 +159,9 @@ def _linear_inverse_kamb(cos_dist, sigma=3):
     return count, _kamb_units(n, radius)
 
 
-def _square_inverse_kamb(cos_dist, sigma=3):
+def _square_inverse_kamb(cos_dist, sigma=3, n=None):
     """Kernel function from Vollemer for inverse square smoothing."""
-    n = float(cos_dist.size)
+    n = float(cos_dist.shape[-1] if n is None else n)
     radius = _kamb_radius(n, sigma)
     f = 3 / (1 - radius)**2
     # cos_dist = cos_dist[cos_dist >= radius]
@@ -140,22 +170,23 @@ def _square_inverse_kamb(cos_dist, sigma=3):
     return count, _kamb_units(n, radius)
 
 
-def _kamb_count(cos_dist, sigma=3):
+def _kamb_count(cos_dist, sigma=3, n=None):
     """Original Kamb kernel function (raw count within radius)."""
-    n = float(cos_dist.size)
+    n = float(cos_dist.shape[-1] if n is None else n)
     dist = _kamb_radius(n, sigma)
     # count = (cos_dist >= dist)
     count = np.array(cos_dist >= dist, dtype=float)
     return count, _kamb_units(n, dist)
 
 
-def _schmidt_count(cos_dist, sigma=None):
+def _schmidt_count(cos_dist, sigma=None, n=None):
     """Schmidt (a.k.a. 1%) counting kernel function."""
+    n = float(cos_dist.shape[-1] if n is None else n)
     radius = 0.01
     count = ((1 - cos_dist) <= radius)
     # To offset the count.sum() - 0.5 required for the kamb methods...
-    count = 0.5 / count.size + count
-    return count, cos_dist.size * radius
+    count = 0.5 / n + count
+    return count, n * radius
 # ------------------------------------------------------------------
 
 
@@ -242,60 +273,102 @@ class KentDistribution(object):
         for gamma in (gamma1, gamma2, gamma3):
             assert len(gamma) == 3
 
-        self._cached_rvs = np.array([], dtype=np.float64)
-        self._cached_rvs.shape = (0, 3)
+    @classmethod
+    def from_spherical(cls, theta, phi, psi, kappa, beta):
+        """
+        Returns Kent distribution defined by spherical coordinates of gammas.
+        """
+
+        (gamma1, gamma2, gamma3) = \
+            cls.spherical_coordinates_to_gammas(theta, phi, psi)
+        return cls(gamma1, gamma2, gamma3, kappa, beta)
+
+    @classmethod
+    def fit(cls, xs, method='mle'):
+        """
+        Returns Kent distribution fitted to unit vectors xs with shape N x 3.
+
+        Method 'me' returns moment estimate (Kent 1982), method 'mle' maximum
+        likelihood estimate starting from moment estimate. As log likelihood
+        depends on data only through mean vector and scatter matrix, they are
+        calculated once and each likelihood evaluation does not depend on N.
+        Requires scipy.
+        """
+
+        xs = np.asarray(xs, dtype=float).reshape(-1, 3)
+        return _kent_fit(len(xs), xs.mean(axis=0),
+                         np.dot(xs.T, xs) / len(xs), method)
+
+    @classmethod
+    def fit_labels(cls, xs, labels, method='mle', axial=False, processes=1):
+        """
+        Returns dictionary of Kent distributions fitted to unit vectors xs
+        with shape N x 3 for each unique label.
+
+        Mean vectors and scatter matrices of all labels are calculated at
+        once and fits could be evaluated in parallel processes. When axial
+        is True, vectors of each label are oriented to half-space of its
+        principal axis before fitting.
+        """
+
+        xs = np.asarray(xs, dtype=float).reshape(-1, 3)
+        assert len(labels) == len(xs), 'Number of labels must match data.'
+        ulabels, inv = np.unique(labels, return_inverse=True)
+        inv = inv.reshape(-1)
+        m = len(ulabels)
+        count = np.bincount(inv, minlength=m)
+        w = (xs[:, :, None] * xs[:, None, :]).reshape(-1, 9)
+        S = np.column_stack([np.bincount(inv, weights=w[:, i], minlength=m)
+                             for i in range(9)]).reshape(-1, 3, 3)
+        S /= count[:, None, None]
+        if axial:
+            _, vects = np.linalg.eigh(S)
+            flip = np.sum(xs * vects[inv, :, -1], axis=1) < 0
+            xs = np.where(flip[:, None], -xs, xs)
+        xbar = np.column_stack([np.bincount(inv, weights=xs[:, i], minlength=m)
+                                for i in range(3)]) / count[:, None]
+        args = [count, xbar, S, [method] * m]
+        if processes > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=processes) as pool:
+                res = list(pool.map(_kent_fit, *args))
+        else:
+            res = [_kent_fit(*arg) for arg in zip(*args)]
+        return dict(zip(ulabels.tolist(), res))
 
     @property
     def Gamma(self):
         return self.create_matrix_Gamma(self.theta, self.phi, self.psi)
 
-    def normalize(self, cache=dict(), return_num_iterations=False):
+    @staticmethod
+    def clear_cache():
+        """Release cached normalization constants."""
+        _kent_log_normalize.cache_clear()
+        _kent_log_normalize_prime.cache_clear()
+
+    def normalize(self, return_num_iterations=False):
         """
         Returns the normalization constant of the Kent distribution.
         The proportional error may be expected not to be greater than 
-        1E-11.
+        1E-11. Normalization constants are kept in bounded LRU cache.
         """
 
-        (k, b) = (self.kappa, self.beta)
-        if not (k, b) in cache:
-            G = gamma_fun
-            I = modified_bessel_2ndkind
-            result = 0.0
-            j = 0
-            if b == 0.0:
-                result = (0.5 * k) ** (-2 * j - 0.5) * I(2 * j + 0.5, k)
-                result /= G(j + 1)
-                result *= G(j + 0.5)
-            else:
-
-                while True:
-                    a = np.exp(np.log(b) * 2 * j + np.log(0.5 * k) * (-2 * j
-                            - 0.5)) * I(2 * j + 0.5, k)
-                    a /= G(j + 1)
-                    a *= G(j + 0.5)
-                    result += a
-
-                    j += 1
-                    if abs(a) < abs(result) * 1E-12 and j > 5:
-                        break
-
-            cache[k, b] = 2 * np.pi * result
+        (logc, j) = _kent_log_normalize(self.kappa, self.beta)
         if return_num_iterations:
-            return (cache[k, b], j)
+            return (np.exp(logc), j)
         else:
-            return cache[k, b]
+            return np.exp(logc)
 
     def log_normalize(self, return_num_iterations=False):
         """
         Returns the logarithm of the normalization constant.
         """
 
+        (logc, j) = _kent_log_normalize(self.kappa, self.beta)
         if return_num_iterations:
-            (normalize, num_iter) = \
-                self.normalize(return_num_iterations=True)
-            return (np.log(normalize), num_iter)
+            return (logc, j)
         else:
-            return np.log(self.normalize())
+            return logc
 
     def pdf_max(self, normalize=True):
         return np.exp(self.log_pdf_max(normalize))
@@ -381,70 +454,34 @@ class KentDistribution(object):
         dfdb = g2x ** 2 - g3x ** 2
         df = np.array([dfdk, dfdb])
         if normalize:
-            return np.transpose(transpose(df) - self.log_normalize_prime())
+            return np.transpose(np.transpose(df) - self.log_normalize_prime())
         else:
             return df
 
-    def normalize_prime(self, cache=dict(), return_num_iterations=False):
+    def normalize_prime(self, return_num_iterations=False):
         """
         Returns the derivative of the normalization factor with respect to kappa and beta.
         """
 
-        (k, b) = (self.kappa, self.beta)
-        if not (k, b) in cache:
-            G = gamma_fun
-            I = modified_bessel_2ndkind
-            dIdk = lambda v, z: modified_bessel_2ndkind_derivative(v,
-                    z, 1)
-            (dcdk, dcdb) = (0.0, 0.0)
-            j = 0
-            if b == 0:
-                dcdk = G(j + 0.5) / G(j + 1) * ((-0.5 * j - 0.125) * k
-                        ** (-2 * j - 1.5)) * I(2 * j + 0.5, k)
-                dcdk += G(j + 0.5) / G(j + 1) * (0.5 * k) ** (-2 * j
-                        - 0.5) * dIdk(2 * j + 0.5, k)
-
-                dcdb = 0.0
-            else:
-                while True:
-                    dk = (-1 * j - 0.25) * np.exp(np.log(b) * 2 * j + np.og(0.5
-                            * k) * (-2 * j - 1.5)) * I(2 * j + 0.5, k)
-                    dk += np.exp(np.log(b) * 2 * j + np.log(0.5 * k) * (-2 * j
-                              - 0.5)) * dIdk(2 * j + 0.5, k)
-                    dk /= G(j + 1)
-                    dk *= G(j + 0.5)
-
-                    db = 2 * j * np.exp(np.log(b) * (2 * j - 1) + np.log(0.5
-                            * k) * (-2 * j - 0.5)) * I(2 * j + 0.5, k)
-                    db /= G(j + 1)
-                    db *= G(j + 0.5)
-                    dcdk += dk
-                    dcdb += db
-
-                    j += 1
-                    if abs(dk) < abs(dcdk) * 1E-12 and abs(db) \
-                        < abs(dcdb) * 1E-12 and j > 5:
-                        break
-
-        # print("dc", dcdk, dcdb, "(", k, b)
-
-            cache[k, b] = 2 * np.pi * np.array([dcdk, dcdb])
+        (prime, j) = _kent_log_normalize_prime(self.kappa, self.beta)
+        prime = prime * self.normalize()
         if return_num_iterations:
-            return (cache[k, b], j)
+            return (prime, j)
         else:
-            return cache[k, b]
+            return prime
 
     def log_normalize_prime(self, return_num_iterations=False):
         """
         Returns the derivative of the logarithm of the normalization factor.
+        It is evaluated directly in scaled form, so it stays finite also
+        for large kappa, when normalization factor itself overflows.
         """
 
+        (prime, j) = _kent_log_normalize_prime(self.kappa, self.beta)
         if return_num_iterations:
-            (normalize_prime, num_iter) = \
-                self.normalize_prime(return_num_iterations=True)
-            return (normalize_prime / self.normalize(), num_iter)
+            return (prime.copy(), j)
         else:
-            return self.normalize_prime() / self.normalize()
+            return prime.copy()
 
     def log_likelihood(self, xs):
         """
@@ -452,7 +489,7 @@ class KentDistribution(object):
         """
 
         retval = self.log_pdf(xs)
-        return np.sum(retval, len(shape(retval)) - 1)
+        return np.sum(retval, len(np.shape(retval)) - 1)
 
     def log_likelihood_prime(self, xs):
         """
@@ -460,42 +497,167 @@ class KentDistribution(object):
         """
 
         retval = self.log_pdf_prime(xs)
-        if len(shape(retval)) == 1:
+        if len(np.shape(retval)) == 1:
             return retval
         else:
-            return np.sum(retval, len(shape(retval)) - 1)
+            return np.sum(retval, len(np.shape(retval)) - 1)
 
-    def _rvs_helper(self):
-        num_samples = 10000
-        xs = gauss(0, 1).rvs((num_samples, 3))
-        xs = np.divide(xs, np.reshape(np.linalg.norm(xs, axis=1), (num_samples, 1)))
-        pvalues = self.pdf(xs, normalize=False)
-        fmax = self.pdf_max(normalize=False)
-        return xs[uniform(0, fmax).rvs(num_samples) < pvalues]
+    def _rvs_helper(self, num_samples, rng=None):
+        """
+        Draws num_samples proposals from Fisher distribution with mean gamma1
+        and concentration kappa - 2 * beta, matching the Kent distribution
+        along its broadest (gamma2) direction, and returns accepted ones.
+        """
 
-    def rvs(self, n_samples=None):
+        rnd = (np.random if rng is None else rng).random
+        (k, b) = (self.kappa, self.beta)
+        kp = max(k - 2 * b, 0.0)
+        # log of envelope bound of k * x1 + b * (x2^2 - x3^2) - kp * x1
+        if b > 0:
+            t = min(max((k - kp) / (2 * b), -1.0), 1.0)
+        else:
+            t = 1.0
+        fmax = (k - kp) * t + b * (1 - t ** 2)
+        u = 1 - rnd(num_samples)
+        if kp > 0:
+            w = 1 + np.log(u + (1 - u) * np.exp(-2 * kp)) / kp
+        else:
+            w = 2 * u - 1
+        w = np.clip(w, -1, 1)
+        phi = 2 * np.pi * rnd(num_samples)
+        r = np.sqrt(1 - w ** 2)
+        xs = (w[:, None] * self.gamma1 +
+              (r * np.cos(phi))[:, None] * self.gamma2 +
+              (r * np.sin(phi))[:, None] * self.gamma3)
+        logratio = (k - kp) * w + b * r ** 2 * np.cos(2 * phi) - fmax
+        return xs[np.log(1 - rnd(num_samples)) < logratio]
+
+    def rvs(self, n_samples=None, rng=None):
         """
-        Returns random samples from the Kent distribution by rejection sampling. 
-        May become inefficient for large kappas.
+        Returns random samples from the Kent distribution by rejection sampling
+        with Fisher distribution proposal, so acceptance rate does not drop
+        with increasing kappa. Proposals are drawn in batches sized by
+        observed acceptance rate.
 
         The returned random samples are 3D unit vectors.
         If n_samples == None then a single sample x is returned with shape (3,)
         If n_samples is an integer value N then N samples are returned in an array with shape (N, 3)
+        If rng is numpy.random.Generator, it is used to draw samples.
         """
 
-        num_samples = (1 if n_samples == None else n_samples)
-        rvs = self._cached_rvs
-        while len(rvs) < num_samples:
-            new_rvs = self._rvs_helper()
-            rvs = np.concatenate([rvs, new_rvs])
-        if n_samples == None:
-            self._cached_rvs = rvs[1:]
+        num_samples = (1 if n_samples is None else int(n_samples))
+        rvs = []
+        (drawn, accepted) = (0, 0)
+        while accepted < num_samples:
+            rate = accepted / drawn if accepted > 0 else 0.5
+            size = int(min(1.1 * (num_samples - accepted) / rate + 16, 2 ** 20))
+            new_rvs = self._rvs_helper(size, rng)
+            rvs.append(new_rvs)
+            drawn += size
+            accepted += len(new_rvs)
+        rvs = np.concatenate(rvs)
+        if n_samples is None:
             return rvs[0]
         else:
-            self._cached_rvs = rvs[num_samples:]
-            retval = rvs[:num_samples]
-            return retval
+            return rvs[:num_samples]
 
     def __repr__(self):
         return 'kent(%s, %s, %s, %s, %s)' % (self.theta, self.phi,
                 self.psi, self.kappa, self.beta)
+
+
+@lru_cache(maxsize=256)
+def _kent_log_normalize(k, b):
+    """Logarithm of normalization constant of the Kent distribution and
+    number of series terms. Scaled Bessel functions are used, so large
+    kappas do not overflow."""
+    from scipy.special import gammaln, ive
+    result = 0.0
+    j = 0
+    if b == 0.0:
+        result = (0.5 * k) ** (-2 * j - 0.5) * ive(2 * j + 0.5, k)
+        result *= np.exp(gammaln(j + 0.5) - gammaln(j + 1))
+    else:
+        while True:
+            a = np.exp(np.log(b) * 2 * j + np.log(0.5 * k) * (-2 * j - 0.5) +
+                       gammaln(j + 0.5) - gammaln(j + 1)) * ive(2 * j + 0.5, k)
+            result += a
+
+            j += 1
+            if abs(a) < abs(result) * 1E-12 and j > 5:
+                break
+    return (np.log(2 * np.pi * result) + k, j)
+
+
+@lru_cache(maxsize=256)
+def _kent_log_normalize_prime(k, b):
+    """Derivative of logarithm of normalization constant of the Kent
+    distribution with respect to kappa and beta and number of series
+    terms. Series are summed with scaled Bessel functions as in
+    ``_kent_log_normalize`` and common factor exp(kappa) cancels, so large
+    kappas do not overflow."""
+    from scipy.special import gammaln, ive
+    (c, dcdk, dcdb) = (0.0, 0.0, 0.0)
+    j = 0
+    while True:
+        v = 2 * j + 0.5
+        if b == 0.0:
+            w = np.exp(np.log(0.5 * k) * -v + gammaln(j + 0.5) - gammaln(j + 1))
+        else:
+            w = np.exp(np.log(b) * 2 * j + np.log(0.5 * k) * -v +
+                       gammaln(j + 0.5) - gammaln(j + 1))
+        i = ive(v, k)
+        a = w * i
+        dk = w * (0.5 * (ive(v - 1, k) + ive(v + 1, k)) - v / k * i)
+        db = 2 * j * w * i / b if j > 0 else 0.0
+        c += a
+        dcdk += dk
+        dcdb += db
+        j += 1
+        if b == 0.0 or (abs(a) < abs(c) * 1E-12 and abs(dk) < abs(dcdk) * 1E-12 and
+                        abs(db) <= abs(dcdb) * 1E-12 and j > 5):
+            break
+    prime = np.array([dcdk, dcdb]) / c
+    prime.flags.writeable = False
+    return (prime, j)
+
+
+def _kent_fit(n, xbar, S, method='mle'):
+    """Fit Kent distribution to data given by number of vectors, mean vector
+    and scatter matrix. Used by ``KentDistribution.fit`` methods."""
+    K = KentDistribution
+    # moment estimate (Kent 1982)
+    gamma1 = xbar / np.linalg.norm(xbar)
+    (theta, phi) = K.gamma1_to_spherical_coordinates(gamma1)
+    H = K.create_matrix_H(theta, phi)
+    B = np.dot(H.T, np.dot(S, H))
+    vals, vects = np.linalg.eigh(B[1:, 1:])
+    gamma2 = np.dot(H[:, 1:], vects[:, -1])
+    gamma3 = np.cross(gamma1, gamma2)
+    r1 = min(np.linalg.norm(xbar), 1 - 1E-12)
+    r2 = vals[-1] - vals[0]
+    kappa = 1.0 / (2.0 - 2.0 * r1 - r2) + 1.0 / (2.0 - 2.0 * r1 + r2)
+    beta = 0.5 * (1.0 / (2.0 - 2.0 * r1 - r2) - 1.0 / (2.0 - 2.0 * r1 + r2))
+    kappa = max(kappa, K.minimum_value_for_kappa)
+    beta = min(max(beta, 0.0), 0.499 * kappa)
+    if method == 'me':
+        return K(gamma1, gamma2, gamma3, kappa, beta)
+    assert method == 'mle', 'Method must be me or mle'
+    from scipy.optimize import minimize
+
+    def negll(x):
+        (g1, g2, g3) = K.spherical_coordinates_to_gammas(*x[:3])
+        k = np.exp(x[3])
+        b = 0.5 * k * x[4]
+        f = k * np.dot(g1, xbar) + \
+            b * (np.dot(g2, np.dot(S, g2)) - np.dot(g3, np.dot(S, g3)))
+        return _kent_log_normalize(k, b)[0] - f
+
+    (theta, phi, psi) = K.gammas_to_spherical_coordinates(gamma1, gamma2)
+    x0 = np.array([theta, phi, psi, np.log(kappa), 2 * beta / kappa])
+    bounds = [(None, None)] * 3 + \
+        [(np.log(K.minimum_value_for_kappa), None), (0.0, 0.999)]
+    res = minimize(negll, x0, method='L-BFGS-B', bounds=bounds)
+    x = res.x if res.fun <= negll(x0) else x0
+    kappa = np.exp(x[3])
+    return K.from_spherical(x[0], x[1], x[2], kappa, 0.5 * kappa * x[4])
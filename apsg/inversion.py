@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+Fault-slip stress inversion
+
+Reduced stress tensor is searched on regular grid of principal axes
+orientations and shape ratios. Predicted slip is parallel to resolved
+shear stress (Wallace-Bott hypothesis) and compressive stress is considered
+negative, so reduced tensor has principal values -1, -phi and 0 for sigma1,
+sigma2 and sigma3, where phi = (sigma2 - sigma3) / (sigma1 - sigma3).
+
+"""
+
+from __future__ import division, print_function
+
+import numpy as np
+from .core import Group
+from .tensors import Stress
+from .helpers import acosd
+
+__all__ = ['stress_inversion']
+
+
+def _orientations(step):
+    """Return (K, 3, 3) array of principal axes (rows sigma1, sigma2 and
+    sigma3) of all orientations of reduced stress tensor with approximate
+    angular spacing of `step` degrees."""
+    n = max(1, int(np.round(2 * np.pi / np.radians(step)**2)))
+    e1 = Group.sfs_vec3(2 * n)._dc
+    # tensor is invariant to sign of axes, half of sphere is enough
+    e1 = e1[e1[:, 2] >= 0]
+    ref = np.where(np.abs(e1[:, :1]) < 0.9, [[1., 0, 0]], [[0, 1., 0]])
+    u = np.cross(e1, ref)
+    u /= np.linalg.norm(u, axis=1)[:, None]
+    v = np.cross(e1, u)
+    theta = np.radians(np.arange(0, 180, step))
+    e1 = np.repeat(e1, len(theta), axis=0)
+    e2 = (np.outer(np.cos(theta), [1, 1, 1])[None] * u[:, None, :] +
+          np.outer(np.sin(theta), [1, 1, 1])[None] * v[:, None, :]).reshape(-1, 3)
+    return np.stack((e1, e2, np.cross(e1, e2)), axis=1)
+
+
+def _reduced(axes, phi):
+    """Return reduced ``Stress`` tensor for principal axes and shape ratio"""
+    s = -(np.outer(axes[0], axes[0]) + phi * np.outer(axes[1], axes[1]))
+    return Stress((s + s.T) / 2)
+
+
+def _slip_cosines(axes, fvec, lvec, phi):
+    """Return (N, K) array of cosines of angles between observed slip
+    vectors and shear stress of K reduced tensors given by principal axes
+    and shape ratios. Cosines are zero for faults with vanishing shear
+    stress."""
+    a = np.dot(fvec, axes[:, 0].T)
+    b = np.dot(fvec, axes[:, 1].T)
+    # t.s and |tau|^2 of traction t = -(a e1 + phi b e2)
+    num = -(a * np.dot(lvec, axes[:, 0].T) + phi * b * np.dot(lvec, axes[:, 1].T))
+    a *= a
+    b *= b
+    den = a + phi * phi * b - (a + phi * b)**2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(den > 1e-12, num / np.sqrt(den), 0.0)
+
+
+def _inversion_chunk(axes, fvec, lvec, phis):
+    """Return (nphi, K) array of mean cosines of angles between observed
+    and predicted slip for chunk of orientations and all shape ratios.
+    Work arrays are reused for all shape ratios. Faults with vanishing
+    shear stress contribute zero, the same way as in ``_slip_cosines``."""
+    a = np.dot(fvec, axes[:, 0].T)
+    b = np.dot(fvec, axes[:, 1].T)
+    as1 = a * np.dot(lvec, axes[:, 0].T)
+    bs2 = b * np.dot(lvec, axes[:, 1].T)
+    a *= a
+    b *= b
+    w = np.full(len(fvec), -1 / len(fvec), dtype=a.dtype)
+    num, den, t = np.empty_like(a), np.empty_like(a), np.empty_like(a)
+    ok = np.empty(a.shape, dtype=bool)
+    scores = np.empty((len(phis), len(axes)))
+    for i, phi in enumerate(phis):
+        # |tau|^2 = |t|^2 - (t.n)^2 of traction t = -(a e1 + phi b e2)
+        np.multiply(b, phi, out=t)
+        t += a
+        t *= t
+        np.multiply(b, phi * phi, out=den)
+        den += a
+        den -= t
+        np.greater(den, 1e-12, out=ok)
+        np.sqrt(den, out=den, where=ok)
+        # t.s
+        np.multiply(bs2, phi, out=num)
+        num += as1
+        np.divide(num, den, out=num, where=ok)
+        np.copyto(num, 0, where=~ok)
+        scores[i] = np.dot(w, num)
+    return scores
+
+
+def stress_inversion(faults, step=10, nphi=20, **kwargs):
+    """Invert fault-slip data for reduced stress tensor by grid search
+
+    All faults are scored against blocks of orientations with matrix
+    products, shape ratios are evaluated for whole block at once. Best
+    grid solutions are re-scored individually and best
+    solution maximizes mean cosine of angles between observed slip vectors
+    and shear stress resolved on fault planes. Slip vector ``lvec`` is
+    expected to be parallel to shear stress resolved on plane with normal
+    ``fvec``, as for ``Fault`` objects. Confidence bounds are estimated
+    from bootstrap replicates of faults, which are scored as weighted sums
+    over best grid solutions of all data, so the grid is searched only once.
+
+    Args:
+      faults: ``FaultSet`` or any object with ``fvec`` and ``lvec`` properties
+      step: angular spacing of orientation grid in degrees. Default 10
+      nphi: number of shape ratios in interval (0, 1). Default 20
+
+    Keyword Args:
+      nboot: number of bootstrap replicates. Default 100
+      conf: confidence level in percents. Default 95
+      seed: seed for bootstrap resampling. Default None
+      candidates: number of best grid solutions re-scored to select best
+        solution and to score bootstrap replicates. Default 1% of grid,
+        at least 1000
+      blocksize: maximum number of orientations - faults pairs scored
+        at once. Default 2**17
+      processes: number of worker processes. Default 1
+
+    Returns:
+      dictionary with best reduced ``Stress`` `stress`, shape ratio `phi`,
+      principal axes `sigma1`, `sigma2`, `sigma3` as ``Lin``, misfit angles
+      of individual faults `misfit`, their mean `mean_misfit`, bootstrap
+      ``Stress`` solutions `bootstrap`, confidence interval of shape ratio
+      `phi_bounds` and confidence cone apical angles `sigma1_cone` and
+      `sigma3_cone` around best principal axes.
+
+    Example:
+      >>> f = FaultSet.examples('MELE')
+      >>> res = stress_inversion(f)
+      >>> res['sigma1'], res['phi'], res['mean_misfit']
+
+    """
+    nboot = kwargs.get('nboot', 100)
+    conf = kwargs.get('conf', 95)
+    blocksize = int(kwargs.get('blocksize', 2**17))
+    processes = kwargs.get('processes', 1)
+    rng = np.random.default_rng(kwargs.get('seed', None))
+    fvec = np.asarray(faults.fvec, dtype=float)
+    lvec = np.asarray(faults.lvec, dtype=float)
+    fvec = fvec / np.linalg.norm(fvec, axis=1)[:, None]
+    lvec = lvec / np.linalg.norm(lvec, axis=1)[:, None]
+    n = len(fvec)
+    phis = (np.arange(nphi) + 0.5) / nphi
+    axes = _orientations(step)
+    nchunk = max(1, blocksize // n)
+    chunks = [axes[i:i + nchunk] for i in range(0, len(axes), nchunk)]
+    args = [chunks, [fvec] * len(chunks), [lvec] * len(chunks),
+            [phis] * len(chunks)]
+    if processes > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            scores = np.hstack(list(pool.map(
+                _inversion_chunk, *args,
+                chunksize=-(-len(chunks) // (4 * processes)))))
+    else:
+        scores = np.hstack([_inversion_chunk(*arg) for arg in zip(*args)])
+    # best grid solutions are re-scored by the same rule as misfits and
+    # also used to score bootstrap replicates
+    ncand = min(kwargs.get('candidates', max(1000, scores.size // 100)), scores.size)
+    cand = np.argsort(scores, axis=None)[::-1][:ncand]
+    cphi, ck = np.unravel_index(cand, scores.shape)
+    cos = np.hstack([_slip_cosines(axes[ck[i:i + nchunk]], fvec, lvec,
+                                   phis[cphi[i:i + nchunk]])
+                     for i in range(0, ncand, nchunk)])
+    ibest = np.argmax(cos.mean(axis=0))
+    iphi, ik = cphi[ibest], ck[ibest]
+    best = axes[ik]
+    stress = _reduced(best, phis[iphi])
+    misfit = acosd(np.clip(cos[:, ibest], -1, 1))
+    if nboot > 0:
+        # bootstrap replicates are scored as weighted sums of cosines of
+        # best solutions of all data only
+        weights = rng.multinomial(n, np.full(n, 1 / n), size=nboot)
+        bix = np.argmax(np.dot(weights, cos), axis=1)
+        bphi, bk = phis[cphi[bix]], ck[bix]
+        lo = (100 - conf) / 2
+        phi_bounds = tuple(np.percentile(bphi, [lo, 100 - lo]))
+        dev1 = acosd(np.clip(np.abs(np.dot(axes[bk, 0], best[0])), 0, 1))
+        dev3 = acosd(np.clip(np.abs(np.dot(axes[bk, 2], best[2])), 0, 1))
+        sigma1_cone = np.percentile(dev1, conf)
+        sigma3_cone = np.percentile(dev3, conf)
+        bootstrap = [_reduced(axes[k], p) for k, p in zip(bk, bphi)]
+    else:
+        phi_bounds = (phis[iphi], phis[iphi])
+        sigma1_cone = sigma3_cone = 0.0
+        bootstrap = []
+    axes_lin = Group.from_dc(best, name=getattr(faults, 'name', 'Default')).aslin
+    return {'stress': stress,
+            'phi': phis[iphi],
+            'sigma1': axes_lin[0],
+            'sigma2': axes_lin[1],
+            'sigma3': axes_lin[2],
+            'misfit': misfit,
+            'mean_misfit': misfit.mean(),
+            'bootstrap': bootstrap,
+            'phi_bounds': phi_bounds,
+            'sigma1_cone': sigma1_cone,
+            'sigma3_cone': sigma3_cone}
@@ -402,7 +402,8 @@ class StereoNet(object):
         else:
             d = StereoGrid(obj, **kwargs)
             # clean kwargs from StereoGrid keywords
-            for att in ['grid','npoints', 'sigma', 'weighted', 'method', 'trim']:
+            for att in ['grid','npoints', 'sigma', 'weighted', 'method', 'trim',
+                        'blocksize', 'workers', 'neighbours']:
                 kwargs.pop(att, None)
         if 'levels' not in kwargs:
             if len(args) == 0:
@@ -431,7 +432,8 @@ class StereoNet(object):
         else:
             d = StereoGrid(obj, **kwargs)
             # clean kwargs from StereoGrid keywords
-            for att in ['grid','npoints', 'sigma', 'weighted', 'method', 'trim']:
+            for att in ['grid','npoints', 'sigma', 'weighted', 'method', 'trim',
+                        'blocksize', 'workers', 'neighbours']:
                 kwargs.pop(att, None)
         if 'levels' not in kwargs:
             if len(args) == 0:
@@ -3,7 +3,7 @@
 from __future__ import division, print_function
 
 import numpy as np
-from .core import Vec3, Group, Pair, Fault
+from .core import Vec3, Group, Pair, Fault, FaultSet, StereoGrid
 from .helpers import sind, cosd
 
 __all__ = ['DefGrad', 'VelGrad', 'Stress']
@@ -358,7 +358,8 @@ class Stress(np.ndarray):
         """Return stress vector associated with plane given by normal vector
 
         Args:
-          n: normal given as ``Vec3`` or ``Fol`` object
+          n: normal given as ``Vec3`` or ``Fol`` object or ``Group`` of
+            normals. For ``Group`` the ``Group`` of stress vectors is returned.
 
         Example:
           >>> S = Stress.from_comp(xx=-5, yy=-2, zz=10, xy=1)
@@ -366,13 +367,17 @@ class Stress(np.ndarray):
           V(-2.520, 0.812, 8.660)
 
         """
+        if isinstance(n, Group):
+            return Group.from_dc(np.dot(np.asarray(n), np.transpose(self)),
+                                 typ=Vec3, name=n.name)
         return Vec3(np.dot(self, n))
 
     def fault(self, n):
         """Return ``Fault`` object derived from given by normal vector
 
         Args:
-          n: normal given as ``Vec3`` or ``Fol`` object
+          n: normal given as ``Vec3`` or ``Fol`` object or ``Group`` of
+            normals. For ``Group`` the ``FaultSet`` is returned.
 
         Example:
           S = Stress.from_comp(xx=-5, yy=-2, zz=10, xy=8)
@@ -380,20 +385,116 @@ class Stress(np.ndarray):
           F:160/30-141/29 +
 
         """
+        if isinstance(n, Group):
+            # slip is parallel to shear stress acting on given normals
+            sn, tau = self.stress_comp(n)
+            return FaultSet.from_vecs(n, tau, name=n.name)
         return Fault.from_vecs(*self.stress_comp(n))
 
     def stress_comp(self, n):
-        """Return normal and shear stress ``Vec3`` components on plane given by normal vector"""
+        """Return normal and shear stress ``Vec3`` components on plane given by normal vector
+
+        For ``Group`` of normals tuple of two ``Group`` objects is returned.
+        """
         t = self.cauchy(n)
+        if isinstance(n, Group):
+            dc = np.asarray(n)
+            sn = dc * (np.sum(np.asarray(t) * dc, axis=1) /
+                       np.linalg.norm(dc, axis=1))[:, None]
+            return (Group.from_dc(sn, typ=Vec3, name=n.name),
+                    Group.from_dc(np.asarray(t) - sn, typ=Vec3, name=n.name))
         sn = t.proj(n)
         return sn, t - sn
 
     def normal_stress(self, n):
-        """Return magnitude of normal stress component on plane given by normal vector"""
+        """Return magnitude of normal stress component on plane given by normal vector
+
+        For ``Group`` of normals array of magnitudes is returned.
+        """
         sn, tau = self.stress_comp(n)
         return abs(sn)
 
     def shear_stress(self, n):
-        """Return magnitude of shear stress component on plane given by normal vector"""
+        """Return magnitude of shear stress component on plane given by normal vector
+
+        For ``Group`` of normals array of magnitudes is returned.
+        """
         sn, tau = self.stress_comp(n)
         return abs(tau)
+
+    def resolve(self, n):
+        """Resolve stress on planes given by normal vectors in single pass
+
+        Compressive stress is considered negative, so dilation tendency is
+        1 for plane normal to least compressive principal stress and 0 for
+        plane normal to most compressive one.
+
+        Args:
+          n: ``Group`` or (N, 3) array of plane normals
+
+        Returns:
+          dictionary with arrays of signed normal stress `normal`, magnitude
+          of shear stress `shear`, slip tendency `slip_tendency` (ratio of
+          shear to normal stress magnitudes), dilation tendency
+          `dilation_tendency` and ``Group`` of unit vectors of shear stress
+          directions `slip`.
+
+        Example:
+          >>> S = Stress([[-8, 0, 0],[0, -5, 0],[0, 0, -1]])
+          >>> res = S.resolve(Group.randn_fol(1000))
+          >>> res['slip_tendency'].max()
+
+        """
+        dc = np.asarray(n, dtype=float).reshape(-1, 3)
+        dc = dc / np.linalg.norm(dc, axis=1)[:, None]
+        t = np.dot(dc, np.transpose(self))
+        sn = np.sum(t * dc, axis=1)
+        tau = t - sn[:, None] * dc
+        shear = np.linalg.norm(tau, axis=1)
+        vals = np.linalg.eigvalsh(np.asarray(self, dtype=float))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            slip = tau / shear[:, None]
+            ts = shear / np.abs(sn)
+            td = (sn - vals[0]) / (vals[-1] - vals[0])
+        slip[shear == 0] = 0
+        return {'normal': sn,
+                'shear': shear,
+                'slip': Group.from_dc(slip, typ=Vec3,
+                                      name=getattr(n, 'name', 'Default')),
+                'slip_tendency': ts,
+                'dilation_tendency': td}
+
+    def slip_tendency(self, n):
+        """Return slip tendency, i.e. ratio of shear stress to normal stress
+        magnitudes, on plane given by normal vector or ``Group`` of normals"""
+        res = self.resolve(n)['slip_tendency']
+        return res if isinstance(n, Group) else res[0]
+
+    def dilation_tendency(self, n):
+        """Return dilation tendency on plane given by normal vector or ``Group``
+        of normals. Compressive stress is considered negative."""
+        res = self.resolve(n)['dilation_tendency']
+        return res if isinstance(n, Group) else res[0]
+
+    def stereogrid(self, quantity='slip_tendency', **kwargs):
+        """Return ``StereoGrid`` of resolved stress quantity on planes with
+        normals given by grid nodes.
+
+        Args:
+          quantity: one of 'normal', 'shear', 'slip_tendency' or
+            'dilation_tendency'. Default 'slip_tendency'
+
+        Keyword arguments are passed to ``StereoGrid``.
+
+        Example:
+          >>> S = Stress([[-8, 0, 0],[0, -5, 0],[0, 0, -1]])
+          >>> s = StereoNet()
+          >>> s.contourf(S.stereogrid('dilation_tendency'))
+
+        """
+        assert quantity in ('normal', 'shear', 'slip_tendency',
+                            'dilation_tendency'), \
+            'Unknown quantity %s' % quantity
+        d = StereoGrid(**kwargs)
+        d.values = self.resolve(d.dcgrid)[quantity]
+        return d
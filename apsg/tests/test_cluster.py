@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+
+import unittest
+
+import numpy as np
+
+from ..core import Lin, Group, Cluster
+
+
+def fcluster_variances(c, nclust):
+    """Within groups variances of flat clusters formed by fcluster"""
+    from scipy.cluster.hierarchy import fcluster
+    res = []
+    for n in nclust:
+        idx = fcluster(c.Z, n, criterion='maxclust')
+        if c.kmeans is not None:
+            idx = idx[c.labels]
+        res.append([100 * c.data[np.flatnonzero(idx == k)].var
+                    for k in np.unique(idx)])
+    return res
+
+
+class TestClusterKmeans(unittest.TestCase):
+
+    def setUp(self):
+
+        rng = np.random.default_rng(4)
+        self.means = [Lin(0, 80), Lin(90, 5), Lin(200, 30)]
+        self.n = 1000
+        g = Group.randn_lin(self.n, mean=self.means[0], sig=5, rng=rng)
+        for mean in self.means[1:]:
+            g = g + Group.randn_lin(self.n, mean=mean, sig=5, rng=rng)
+        self.g = g
+
+    def test_recover_clusters(self):
+        """
+        Check that well separated clusters are recovered.
+        """
+
+        c = Cluster(self.g, kmeans=30, seed=1)
+        c.cluster(maxclust=3)
+        assert len(c.groups) == 3
+        assert sorted(len(g) for g in c.groups) == [self.n] * 3
+        # data of each cluster are from single sample
+        for k in np.unique(c.idx):
+            assert len(np.unique(np.flatnonzero(c.idx == k) // self.n)) == 1
+        assert len(c.R) == 3
+        for mean in self.means:
+            assert min(mean.angle(r) for r in c.R) < 1
+
+    def test_seed_reproducible(self):
+        """
+        Check that same seed gives same labels and centroids.
+        """
+
+        c1 = Cluster(self.g, kmeans=20, seed=7)
+        c2 = Cluster(self.g, kmeans=20, seed=7)
+        assert np.array_equal(c1.labels, c2.labels)
+        assert np.array_equal(np.asarray(c1.centroids), np.asarray(c2.centroids))
+        c1.cluster(maxclust=3)
+        c2.cluster(maxclust=3)
+        assert np.array_equal(c1.idx, c2.idx)
+
+    def test_elbow_match_fcluster(self):
+        """
+        Check that elbow variances match variances of data of flat clusters
+        formed on centroids.
+        """
+
+        c = Cluster(self.g, kmeans=20, seed=3)
+        nclust, var = c.elbow(no_plot=True, n=6)
+        assert nclust == list(range(1, 7))
+        for v, ref in zip(var, fcluster_variances(c, nclust)):
+            assert np.allclose(sorted(v), sorted(ref))
+
+
+class TestClusterElbow(unittest.TestCase):
+
+    def test_elbow_match_fcluster(self):
+        """
+        Check that elbow variances match variances of flat clusters formed
+        by fcluster for each number of clusters.
+        """
+
+        rng = np.random.default_rng(5)
+        g = (Group.randn_lin(30, mean=Lin(120, 40), sig=15, rng=rng) +
+             Group.randn_lin(30, mean=Lin(300, 10), sig=15, rng=rng))
+        for data in (g, g.asfol, g.asvec3):
+            c = Cluster(data)
+            nclust, var = c.elbow(no_plot=True)
+            assert nclust == list(range(1, 7))
+            for v, ref in zip(var, fcluster_variances(c, nclust)):
+                assert np.allclose(sorted(v), sorted(ref))
+            nclust, var = c.elbow(no_plot=True, n=15)
+            assert len(var) == 15
+            for v, ref in zip(var, fcluster_variances(c, nclust)):
+                assert np.allclose(sorted(v), sorted(ref))
+
+
+if __name__ == '__main__':
+
+    unittest.main()
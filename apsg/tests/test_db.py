@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+import numpy as np
+
+from ..core import Lin, Fol, Group
+from ..db import SDB
+
+
+def make_sdb(fname, nsites=6, nmeas=400, seed=0):
+    """Create small PySDB database with random data"""
+    rng = np.random.default_rng(seed)
+    conn = sqlite3.connect(fname)
+    conn.executescript("""
+    CREATE TABLE meta (id INTEGER PRIMARY KEY, name TEXT, value TEXT);
+    CREATE TABLE units (id INTEGER PRIMARY KEY, name TEXT, description TEXT);
+    CREATE TABLE sites (id INTEGER PRIMARY KEY, id_units INTEGER, name TEXT,
+                        x_coord REAL, y_coord REAL, description TEXT);
+    CREATE TABLE structype (id INTEGER PRIMARY KEY, pos INTEGER,
+                            structure TEXT, description TEXT,
+                            structcode INTEGER, groupcode INTEGER,
+                            planar INTEGER);
+    CREATE TABLE structdata (id INTEGER PRIMARY KEY, id_sites INTEGER,
+                             id_structype INTEGER, azimuth REAL,
+                             inclination REAL, description TEXT);
+    CREATE TABLE tags (id INTEGER PRIMARY KEY, pos INTEGER, name TEXT,
+                       description TEXT);
+    CREATE TABLE tagged (id INTEGER PRIMARY KEY, id_tags INTEGER,
+                         id_structdata INTEGER);
+    """)
+    conn.executemany("INSERT INTO meta (name, value) VALUES (?,?)",
+                     [('version', '3.0.0'), ('crs', 'EPSG:5514')])
+    conn.executemany("INSERT INTO units (id, name) VALUES (?,?)",
+                     [(1, 'HG'), (2, 'MG')])
+    conn.executemany("INSERT INTO sites (id, id_units, name, x_coord, y_coord) "
+                     "VALUES (?,?,?,?,?)",
+                     [(i + 1, i % 2 + 1, 'PB%d' % i, rng.random(), rng.random())
+                      for i in range(nsites)])
+    conn.executemany("INSERT INTO structype (id, structure, planar) "
+                     "VALUES (?,?,?)",
+                     [(1, 'S1', 1), (2, 'L1', 0), (3, 'S0', 1), (4, 'L2', 0)])
+    conn.executemany("INSERT INTO structdata (id, id_sites, id_structype, "
+                     "azimuth, inclination) VALUES (?,?,?,?,?)",
+                     [(i + 1, int(rng.integers(1, nsites + 1)),
+                       int(rng.integers(1, 5)), rng.uniform(0, 360),
+                       rng.uniform(0, 90)) for i in range(nmeas)])
+    conn.executemany("INSERT INTO tags (id, name) VALUES (?,?)",
+                     [(1, 'bos'), (2, 'fold')])
+    conn.executemany("INSERT INTO tagged (id_tags, id_structdata) VALUES (?,?)",
+                     [(t, i + 1) for i in range(nmeas) for t in (1, 2)
+                      if rng.random() < 0.3])
+    conn.commit()
+    conn.close()
+
+
+class TestSDBGroups(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+
+        cls.tmpdir = tempfile.mkdtemp()
+        cls.fname = os.path.join(cls.tmpdir, 'test.sdb')
+        make_sdb(cls.fname)
+        conn = sqlite3.connect(cls.fname)
+        cls.rows = conn.execute("""
+            SELECT sites.name, structype.structure, structype.planar,
+            structdata.azimuth, structdata.inclination FROM structdata
+            INNER JOIN sites ON structdata.id_sites=sites.id
+            INNER JOIN structype ON structype.id = structdata.id_structype
+            ORDER BY structdata.id""").fetchall()
+        conn.close()
+
+    @classmethod
+    def tearDownClass(cls):
+
+        shutil.rmtree(cls.tmpdir)
+
+    def setUp(self):
+
+        self.db = SDB(self.fname)
+
+    def tearDown(self):
+
+        self.db.close()
+
+    def test_groups_by_site_match_rows(self):
+        """
+        Check that groups by site are keyed by site and structure and
+        contain same data as groups created from individual rows.
+        """
+
+        gs = self.db.groups('site')
+        keys = set((r[0], r[1]) for r in self.rows)
+        assert set(gs) == keys
+        for site, struct in keys:
+            rows = [r for r in self.rows if r[0] == site and r[1] == struct]
+            typ = Fol if rows[0][2] else Lin
+            g = Group([typ(r[3], r[4]) for r in rows])
+            assert gs[site, struct].type is typ
+            assert np.allclose(np.asarray(gs[site, struct]), np.asarray(g))
+
+    def test_groups_match_group(self):
+        """
+        Check that groups match groups retrieved one by one.
+        """
+
+        gs = self.db.groups(('unit', 'structure'))
+        for unit in self.db.units():
+            for struct in self.db.structures(units=unit):
+                g = self.db.group(struct, units=unit)
+                assert np.allclose(np.asarray(gs[unit, struct]), np.asarray(g))
+        gs = self.db.groups()
+        assert set(gs) == set(self.db.structures())
+        for struct, n in self.db.counts().items():
+            assert len(gs[struct]) == n
+
+    def test_groups_by_tag(self):
+        """
+        Check that measurement with more tags belongs to group of each tag.
+        """
+
+        gs = self.db.groups('tag', structs=['S1', 'L1'])
+        for tag in ('bos', 'fold'):
+            for struct in ('S1', 'L1'):
+                counts = self.db.counts(structs=struct, tags=tag)
+                assert len(gs[tag, struct]) == counts[struct]
+
+
+if __name__ == '__main__':
+
+    unittest.main()
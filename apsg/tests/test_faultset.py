@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+
+
+import unittest
+import warnings
+
+import numpy as np
+
+from ..core import Vec3, Lin, Fol, Pair, Fault, Group, PairSet, FaultSet
+from ..tensors import Stress
+
+
+class TestFaultSet(unittest.TestCase):
+
+    def setUp(self):
+
+        rng = np.random.default_rng(1)
+        n = 200
+        self.fazis = rng.uniform(0, 360, n)
+        self.fincs = rng.uniform(10, 89, n)
+        lazis, lincs = [], []
+        # lineations are not close to horizontal, so sense is well defined
+        for a, i in zip(self.fazis, self.fincs):
+            l = Fol(a, i).rake(rng.uniform(15, 165))
+            l = l.rotate(Lin(rng.uniform(0, 360), 0), rng.uniform(-2, 2))
+            lazis.append(l.aslin.dd[0])
+            lincs.append(l.aslin.dd[1])
+        self.lazis, self.lincs = np.array(lazis), np.array(lincs)
+        self.senses = rng.choice([-1, 1], n)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            self.fs = FaultSet.from_array(self.fazis, self.fincs, self.lazis,
+                                          self.lincs, self.senses)
+            self.faults = [Fault(*r) for r in zip(self.fazis, self.fincs,
+                                                  self.lazis, self.lincs,
+                                                  self.senses)]
+
+    def test_from_array_match_faults(self):
+        """
+        Check that arrays of FaultSet match properties of Fault objects.
+        """
+
+        for attr in ('fvec', 'lvec', 'p', 't', 'm', 'd', 'pvec', 'tvec'):
+            assert np.allclose(np.asarray(getattr(self.fs, attr)),
+                               [getattr(f, attr) for f in self.faults],
+                               atol=1e-12), attr
+        assert np.allclose(self.fs.misfit, [f.misfit for f in self.faults])
+        assert np.array_equal(self.fs.sense, self.senses)
+        assert np.array_equal(self.fs.sense, [f.sense for f in self.faults])
+
+    def test_rotate_match_faults(self):
+        """
+        Check that rotated FaultSet match rotated Fault objects.
+        """
+
+        r = self.fs.rotate(Lin(30, 40), 70)
+        rf = [f.rotate(Lin(30, 40), 70) for f in self.faults]
+        assert np.allclose(np.asarray(r.fvec), [f.fvec for f in rf])
+        assert np.allclose(np.asarray(r.lvec), [f.lvec for f in rf])
+        assert np.array_equal(r.sense, [f.sense for f in rf])
+
+    def test_from_vecs_sense(self):
+        """
+        Check that sense of FaultSet created from vectors does not depend
+        on their length and match sense of Fault objects.
+        """
+
+        fvec, lvec = np.asarray(self.fs.fvec), np.asarray(self.fs.lvec)
+        for f, l in ((fvec, lvec), (-2 * fvec, -3 * lvec), (5 * fvec, lvec)):
+            fs = FaultSet.from_vecs(f, l)
+            assert np.array_equal(fs.sense, self.senses)
+            assert np.allclose(np.asarray(fs.fvec), fvec)
+            assert np.allclose(np.asarray(fs.lvec), lvec)
+        fs = FaultSet.from_vecs(-fvec, lvec)
+        assert np.array_equal(fs.sense, -self.senses)
+
+    def test_stress_fault_slip(self):
+        """
+        Check that slip of faults created from stress tensor is parallel
+        to shear stress on fault planes.
+        """
+
+        S = Stress.from_comp(xx=-5, yy=-2, zz=10, xy=8)
+        g = Group.randn_fol(50)
+        fs = S.fault(g)
+        sn, tau = S.stress_comp(g)
+        tau = np.asarray(tau) / np.linalg.norm(tau, axis=1)[:, None]
+        assert np.allclose(np.asarray(fs.fvec), np.asarray(g))
+        assert np.allclose(np.asarray(fs.lvec), tau)
+
+    def test_angmech_match_faults(self):
+        """
+        Check that Angelier-Mechler dihedra match node by node evaluation
+        over individual faults.
+        """
+
+        def classic(dc, faults):
+            val = 0
+            for f in faults:
+                val += 2 * float(np.sign(dc.dot(f.fvec)) ==
+                                 np.sign(dc.dot(f.lvec))) - 1
+            return val
+
+        def probability(dc, faults):
+            val = 0
+            d = Vec3(dc).aslin
+            for f in faults:
+                s = 2 * float(np.sign(dc.dot(f.fvec)) ==
+                              np.sign(dc.dot(f.lvec))) - 1
+                lprob = (1 - abs(45 - f.lin.angle(d)) / 45)
+                fprob = (1 - abs(45 - f.fol.angle(d)) / 45)
+                val += s * lprob * fprob
+            return val
+
+        fs = self.fs[:40]
+        faults = self.faults[:40]
+        for method, func in (('classic', classic),
+                             ('probability', probability)):
+            for kw in ({}, {'blocksize': 100}):
+                d = fs.angmech(method=method, npoints=400, **kw)
+                ref = np.array([func(dc, faults) for dc in d.dcgrid])
+                assert np.allclose(d.values, ref), (method, kw)
+
+    def test_pairset_match_pairs(self):
+        """
+        Check that arrays of PairSet match properties of Pair objects.
+        """
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            ps = PairSet.from_array(self.fazis, self.fincs,
+                                    self.lazis, self.lincs)
+            pairs = [Pair(*r) for r in zip(self.fazis, self.fincs,
+                                           self.lazis, self.lincs)]
+        for attr in ('fvec', 'lvec', 'rax'):
+            assert np.allclose(np.asarray(getattr(ps, attr)),
+                               [getattr(p, attr) for p in pairs]), attr
+        assert np.allclose(ps.misfit, [p.misfit for p in pairs])
+        assert isinstance(ps[0], Pair)
+        assert isinstance(ps.fvec[0], Vec3)
+
+
+if __name__ == '__main__':
+
+    unittest.main()
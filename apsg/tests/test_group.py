@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+
+
+import unittest
+
+import numpy as np
+
+from ..core import Vec3, Lin, Fol, Group
+from ..helpers import acosd
+
+
+class TestGroupArray(unittest.TestCase):
+
+    def setUp(self):
+
+        self.g = Group.randn_lin(100, mean=Lin(120, 40), sig=20)
+
+    def test_array_is_read_only(self):
+        """
+        Check that data of group could not be changed through numpy array.
+        """
+
+        a = np.asarray(self.g)
+        assert not a.flags.writeable
+        with self.assertRaises(ValueError):
+            a[0] = 0
+        with self.assertRaises(ValueError):
+            np.asarray(self.g[:10])[:] = 0
+
+    def test_array_copy(self):
+        """
+        Check that copied array is writeable and independent of group.
+        """
+
+        R = self.g.R
+        a = np.array(self.g)
+        a[:] = 0
+        assert self.g.R == R
+        assert np.asarray(self.g, dtype=np.float32).dtype == np.float32
+
+    def test_slice_copy_on_write(self):
+        """
+        Check that item assignment to sliced group does not change parent and
+        cached statistics are updated.
+        """
+
+        s = self.g[:10]
+        item = s[1]
+        R, sR = self.g.R, s.R
+        s[0] = Lin(0, 0)
+        assert self.g.R == R
+        assert s.R != sR
+        self.g[1] = Lin(0, 0)
+        assert s[1] == item
+        assert self.g.R != R
+
+    def test_items_match_objects(self):
+        """
+        Check that integer indexing, iteration and conversions return objects
+        equal to constructed ones.
+        """
+
+        data = [Lin(120, 20), Lin(151, 23), Lin(137, 28)]
+        g = Group(data)
+        assert all(a == b for a, b in zip(g, data))
+        assert all(isinstance(e, Lin) for e in g)
+        assert isinstance(g.asfol[0], Fol)
+        assert isinstance(g.asvec3[0], Vec3)
+        assert np.allclose(g.angle(), [data[0].angle(data[1]),
+                                      data[0].angle(data[2]),
+                                      data[1].angle(data[2])])
+
+
+class TestGroupStatistics(unittest.TestCase):
+
+    def scalar_resultant(self, g):
+        """Resultant summed over individual objects of centered data"""
+
+        if g.type is Vec3:
+            r = Vec3([0, 0, 0])
+            for v in g:
+                r = r + v
+            return r
+        _, _, u = np.linalg.svd(g.ortensor.cov)
+        r = Vec3([0, 0, 0])
+        for d in g:
+            c = d.transform(u).rotate(Lin(90, 0), 90)
+            r = r + Vec3(*(c.aslin.dd if g.type is Fol else c.dd))
+        r = r.asfol if g.type is Fol else r.aslin
+        return r.rotate(Lin(90, 0), -90).transform(u.T)
+
+    def test_statistics_match_scalar(self):
+        """
+        Check that resultant based statistics match statistics computed
+        from individual objects.
+        """
+
+        for g in (Group.randn_lin(100, mean=Lin(120, 40), sig=20),
+                  Group.randn_fol(100, mean=Fol(300, 70), sig=30),
+                  Group.randn_lin(100, mean=Lin(20, 10), sig=15).asvec3):
+            N = len(g)
+            ref = self.scalar_resultant(g)
+            R = abs(ref)
+            assert type(g.R) is g.type
+            assert np.isclose(abs(g.R), R)
+            assert g.R.angle(ref) < 1e-5
+            dots = [np.dot(d, ref.uv) for d in g]
+            if g.type is not Vec3:
+                dots = np.abs(dots)
+            assert np.isclose(g.totvar, 1 - np.mean(dots))
+            assert np.isclose(g.var, 1 - R / N)
+            assert np.isclose(g.delta, acosd(R / N))
+            assert np.isclose(g.rdegree, 100 * (2 * R - N) / N)
+            k = (N - 1) / (N - R)
+            assert np.isclose(g.fisher_stats['k'], k)
+            assert np.isclose(g.fisher_stats['csd'], 81 / np.sqrt(k))
+            assert np.isclose(g.fisher_stats['a95'],
+                              acosd(1 - ((N - R) / R) * (20**(1 / (N - 1)) - 1)))
+
+    def test_statistics_updated(self):
+        """
+        Check that cached statistics are updated when group is changed.
+        """
+
+        g = Group.randn_lin(50, mean=Lin(120, 40), sig=20)
+        g.R
+        g.append(Lin(0, 0))
+        g.extend([Lin(10, 5), Lin(20, 5)])
+        assert np.isclose(abs(g.R), abs(self.scalar_resultant(g)))
+        assert np.isclose(g.var, 1 - abs(self.scalar_resultant(g)) / 53)
+
+
+class TestGroupHalfspace(unittest.TestCase):
+
+    def test_oriented_to_principal_axis(self):
+        """
+        Check that all vectors have non-negative dot product with principal
+        axis of orientation tensor.
+        """
+
+        rng = np.random.default_rng(8)
+        for g in (Group.randn_lin(200, mean=Lin(120, 40), sig=20, rng=rng),
+                  Group.randn_fol(200, mean=Fol(300, 80), sig=20, rng=rng),
+                  Group.randn_lin(200, mean=Lin(20, 5), sig=15, rng=rng)):
+            h = g.halfspace
+            assert h.type is g.type
+            assert len(h) == len(g)
+            dc = np.asarray(h)
+            assert np.all(np.dot(dc, g.ortensor.vects[0]) >= 0)
+            assert np.all(np.dot(dc, dc.sum(axis=0)) >= 0)
+            # only orientation of vectors is changed
+            assert np.allclose(np.abs(np.sum(dc * np.asarray(g), axis=1)), 1)
+
+    def test_bimodal_horizontal(self):
+        """
+        Check that lineations around horizontal, stored in lower hemisphere
+        as two opposite clusters, end up in single half-space.
+        """
+
+        rng = np.random.default_rng(9)
+        azi = 90 + rng.normal(0, 10, 300) + 180 * rng.integers(0, 2, 300)
+        inc = np.abs(rng.normal(0, 5, 300))
+        g = Group.from_array(azi, inc, typ=Lin)
+        dc = np.asarray(g)
+        # both clusters are present in data
+        assert np.any(dc[:, 1] > 0.9) and np.any(dc[:, 1] < -0.9)
+        dc = np.asarray(g.halfspace)
+        assert np.all(dc[:, 1] * dc[0, 1] > 0)
+        assert np.all(np.dot(dc, dc.T) > 0)
+        assert np.all(np.dot(dc, g.ortensor.vects[0]) >= 0)
+        assert g.halfspace.R.angle(Lin(90, 0)) < 5
+
+class TestGroupBootstrap(unittest.TestCase):
+
+    def resampled(self, g, N, blocksize, seed):
+        """Groups of rows resampled the same way as bootstrap_stats"""
+
+        res = []
+        seeds = np.random.SeedSequence(seed).spawn(-(-N // blocksize))
+        for start, ss in zip(range(0, N, blocksize), seeds):
+            rng = np.random.default_rng(ss)
+            idx = rng.integers(0, len(g), (min(blocksize, N - start), len(g)))
+            res.extend(g[ix] for ix in idx)
+        return res
+
+    def test_seed_reproducible(self):
+        """
+        Check that seeded results are reproduced regardless of number of
+        processes.
+        """
+
+        g = Group.randn_lin(50, mean=Lin(120, 40), sig=20)
+        stats = ('R', 'fisher', 'eigenvals')
+        b1 = g.bootstrap_stats(40, stats=stats, seed=11, blocksize=16)
+        b2 = g.bootstrap_stats(40, stats=stats, seed=11, blocksize=16)
+        b3 = g.bootstrap_stats(40, stats=stats, seed=11, blocksize=16,
+                               processes=2)
+        b4 = g.bootstrap_stats(40, stats=stats, seed=12, blocksize=16)
+        for key in ('k', 'csd', 'a95', 'eigenvals'):
+            assert np.array_equal(b1[key], b2[key])
+            assert np.array_equal(b1[key], b3[key])
+        assert np.array_equal(np.asarray(b1['R']), np.asarray(b2['R']))
+        assert not np.array_equal(b1['k'], b4['k'])
+
+    def test_replicates_match_groups(self):
+        """
+        Check that each replicate equals statistics of group of resampled
+        rows.
+        """
+
+        for g in (Group.randn_lin(30, mean=Lin(120, 40), sig=20),
+                  Group.randn_fol(30, mean=Fol(10, 60), sig=30),
+                  Group.randn_lin(30, mean=Lin(200, 20), sig=20).asvec3):
+            bs = g.bootstrap_stats(25, stats=('R', 'fisher', 'eigenvals'),
+                                   seed=5, blocksize=10)
+            assert bs['R'].type is g.type
+            samples = self.resampled(g, 25, 10, 5)
+            assert len(samples) == len(bs['R']) == 25
+            for i, sg in enumerate(samples):
+                assert np.isclose(abs(bs['R'][i]), abs(sg.R))
+                assert bs['R'][i].angle(sg.R) < 1e-5
+                for key in ('k', 'csd', 'a95'):
+                    assert np.isclose(bs[key][i], sg.fisher_stats[key])
+                assert np.allclose(bs['eigenvals'][i], sg.ortensor.eigenvals)
+
+
+if __name__ == '__main__':
+
+    unittest.main()
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+
+
+import unittest
+
+import numpy as np
+
+from ..core import Lin, Group, FaultSet
+from ..tensors import Stress
+from ..inversion import stress_inversion
+
+
+class TestStressInversion(unittest.TestCase):
+
+    def setUp(self):
+
+        e1 = Lin(120, 30).uv
+        e2 = e1.cross(Lin(210, 0)).uv
+        self.s1, self.s3 = e1.aslin, e1.cross(e2).aslin
+        self.phi = 0.4
+        S = Stress(-(np.outer(e1, e1) + self.phi * np.outer(e2, e2)))
+        self.faults = S.fault(Group.uniform_fol(200))
+
+    def test_recover_known_tensor(self):
+        """
+        Check that reduced tensor used to create synthetic faults is recovered
+        for several grid steps.
+        """
+
+        for step in (5, 10, 15):
+            res = stress_inversion(self.faults, step=step, nphi=20, nboot=20, seed=1)
+            assert res['sigma1'].angle(self.s1) < step
+            assert res['sigma3'].angle(self.s3) < step
+            assert abs(res['phi'] - self.phi) < 0.15
+            assert res['mean_misfit'] < step
+            assert np.all(res['misfit'] >= 0) and np.all(res['misfit'] <= 180)
+
+    def test_examples_consistent(self):
+        """
+        Check that solutions of example dataset do not depend much on grid step.
+        """
+
+        f = FaultSet.examples('MELE')
+        res = [f.stress_inversion(step=step, nboot=0) for step in (5, 10)]
+        assert res[0]['sigma1'].angle(res[1]['sigma1']) < 10
+        assert abs(res[0]['mean_misfit'] - res[1]['mean_misfit']) < 3
+        assert res[0]['mean_misfit'] < 30
+
+
+if __name__ == '__main__':
+
+    unittest.main()
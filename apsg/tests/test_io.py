@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+
+
+import io
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+import warnings
+
+import numpy as np
+
+from ..core import Lin, Fol, Pair, Fault, Group, PairSet, FaultSet
+
+
+class TestNpz(unittest.TestCase):
+
+    def setUp(self):
+
+        self.tmpdir = tempfile.mkdtemp()
+        self.g = Group.randn_fol(500, mean=Fol(120, 40), sig=20, name='S1')
+        self.fs = FaultSet.examples('MELE')
+
+    def tearDown(self):
+
+        shutil.rmtree(self.tmpdir)
+
+    def test_group_round_trip(self):
+        """
+        Check that group loaded from npz file match saved one.
+        """
+
+        fname = os.path.join(self.tmpdir, 'group.npz')
+        self.g.to_npz(fname)
+        for mmap in (True, False):
+            g = Group.from_npz(fname, mmap=mmap)
+            assert g.type is Fol
+            assert g.name == 'S1'
+            assert np.array_equal(np.asarray(g), np.asarray(self.g))
+            assert all(a == b for a, b in zip(g, self.g))
+            assert np.isclose(abs(g.R), abs(self.g.R))
+
+    def test_mmap_copy_on_write(self):
+        """
+        Check that changes of memory-mapped group are not written to file.
+        """
+
+        fname = os.path.join(self.tmpdir, 'group.npz')
+        self.g.to_npz(fname)
+        g = Group.from_npz(fname)
+        g[0] = Fol(0, 0)
+        g.append(Fol(10, 10))
+        assert len(g) == len(self.g) + 1
+        g = Group.from_npz(fname)
+        assert np.array_equal(np.asarray(g), np.asarray(self.g))
+
+    def test_sets_round_trip(self):
+        """
+        Check that PairSet and FaultSet loaded from npz files match saved
+        ones including senses of faults.
+        """
+
+        fname = os.path.join(self.tmpdir, 'faults.npz')
+        self.fs.to_npz(fname)
+        fs = FaultSet.from_npz(fname)
+        assert fs.name == self.fs.name
+        assert np.array_equal(fs.sense, self.fs.sense)
+        assert np.array_equal(np.asarray(fs.fvec), np.asarray(self.fs.fvec))
+        assert np.array_equal(np.asarray(fs.lvec), np.asarray(self.fs.lvec))
+        assert all(a.sense == b.sense for a, b in zip(fs, self.fs))
+        ps = PairSet._from_arrays(self.fs._fvec, np.abs(self.fs._lvec),
+                                  self.fs._misfit, name='pairs')
+        fname = os.path.join(self.tmpdir, 'pairs.npz')
+        ps.to_npz(fname)
+        res = PairSet.from_npz(fname, mmap=False)
+        assert np.array_equal(np.asarray(res.lin), np.asarray(ps.lin))
+        with self.assertRaises(AssertionError):
+            FaultSet.from_npz(fname)
+
+
+class TestCsv(unittest.TestCase):
+
+    def setUp(self):
+
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+
+        shutil.rmtree(self.tmpdir)
+
+    def test_group_match_rows(self):
+        """
+        Check that group read by chunks match objects created row by row.
+        """
+
+        fname = os.path.join(self.tmpdir, 'group.csv')
+        g = Group.randn_lin(1000, mean=Lin(120, 40), sig=20)
+        g.to_csv(fname)
+        rows = np.loadtxt(fname, delimiter=',')
+        for typ in (Lin, Fol):
+            ref = Group([typ(a, i) for a, i in rows])
+            for chunksize in (2**16, 64, 1):
+                res = Group.from_csv(fname, typ=typ, chunksize=chunksize)
+                assert res.type is typ
+                assert len(res) == len(ref)
+                assert np.allclose(np.asarray(res), np.asarray(ref))
+        # lineations are axial, so they are compared regardless of sign
+        dots = np.sum(np.asarray(Group.from_csv(fname)) * np.asarray(g), axis=1)
+        assert np.allclose(np.abs(dots), 1)
+
+    def test_sets_match_rows(self):
+        """
+        Check that PairSet and FaultSet read by chunks match objects created
+        row by row.
+        """
+
+        fname = os.path.join(self.tmpdir, 'faults.csv')
+        fs = FaultSet.examples('MELE')
+        fs.to_csv(fname)
+        rows = np.loadtxt(fname, delimiter=',')
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            faults = [Fault(*r) for r in rows]
+            pairs = [Pair(*r[:4]) for r in rows]
+            for chunksize in (2**16, 10):
+                res = FaultSet.from_csv(fname, chunksize=chunksize)
+                assert np.array_equal(res.sense, rows[:, 4])
+                # sense of vertical planes or horizontal lineations depends
+                # on rounding of individual objects
+                ok = np.all(np.abs(np.c_[rows[:, 1], rows[:, 3]] -
+                                   [90, 0]) > 1e-6, axis=1)
+                assert np.array_equal(res.sense[ok],
+                                      np.array([f.sense for f in faults])[ok])
+                assert np.allclose(np.asarray(res.fvec),
+                                   [f.fvec for f in faults])
+                assert np.allclose(np.asarray(res.lvec),
+                                   [f.lvec for f in faults])
+                res = PairSet.from_csv(fname, chunksize=chunksize)
+                assert np.allclose(np.asarray(res.lvec),
+                                   [p.lvec for p in pairs])
+                assert np.allclose(res.misfit, [p.misfit for p in pairs])
+
+
+class LegacyGroup(list):
+    """List of objects to be pickled as list based ``Group``"""
+
+
+class LegacyPickler(pickle.Pickler):
+    """Pickle ``LegacyGroup`` the same way as list based ``Group``"""
+
+    def reducer_override(self, obj):
+        if isinstance(obj, LegacyGroup):
+            return (object.__new__, (Group,),
+                    {'type': type(obj[0]), 'name': 'legacy'}, iter(obj))
+        return NotImplemented
+
+
+class TestFile(unittest.TestCase):
+
+    def setUp(self):
+
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+
+        shutil.rmtree(self.tmpdir)
+
+    def test_legacy_file(self):
+        """
+        Check that group saved as pickled list subclass could be loaded.
+        """
+
+        data = [Lin(120, 20), Lin(151, 23), Lin(137, 28)]
+        fname = os.path.join(self.tmpdir, 'group.dat')
+        buf = io.BytesIO()
+        LegacyPickler(buf, protocol=4).dump(LegacyGroup(data))
+        with open(fname, 'wb') as f:
+            f.write(buf.getvalue())
+        g = Group.from_file(fname)
+        assert g.type is Lin
+        assert len(g) == 3
+        assert all(a == b for a, b in zip(g, data))
+        assert np.isclose(abs(g.R), abs(Group(data).R))
+        g.append(Lin(100, 10))
+        assert len(g) == 4
+
+    def test_file_round_trip(self):
+        """
+        Check that group saved to file match loaded one.
+        """
+
+        g = Group.randn_fol(20, name='S1')
+        fname = os.path.join(self.tmpdir, 'group.dat')
+        g.to_file(fname)
+        res = Group.from_file(fname)
+        assert res.type is Fol
+        assert np.array_equal(np.asarray(res), np.asarray(g))
+
+
+if __name__ == '__main__':
+
+    unittest.main()
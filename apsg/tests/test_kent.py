@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+
+
+import unittest
+
+import numpy as np
+
+from ..helpers import KentDistribution, _kent_log_normalize
+from ..core import Group, Pair
+
+
+class TestKentDistribution(unittest.TestCase):
+
+    def test_log_normalize_prime(self):
+        """
+        Check derivative of log normalization constant against finite differences,
+        also for large kappa, when normalization constant overflows.
+        """
+
+        for k, b in [(5., 1.), (30., 10.), (100., 40.), (1500., 300.), (50., 0.)]:
+            d = KentDistribution.from_spherical(0.3, 0.5, 0.2, k, b)
+            prime = d.log_normalize_prime()
+            hk, hb = 1e-5 * k, 1e-5 * max(b, 1)
+            dk = (_kent_log_normalize(k + hk, b)[0] - _kent_log_normalize(k - hk, b)[0]) / (2 * hk)
+            assert np.all(np.isfinite(prime))
+            assert np.isclose(prime[0], dk, rtol=1e-6)
+            if b > 0:
+                db = (_kent_log_normalize(k, b + hb)[0] - _kent_log_normalize(k, b - hb)[0]) / (2 * hb)
+                assert np.isclose(prime[1], db, rtol=1e-5)
+
+    def test_normalize_prime_scaled(self):
+        """
+        Check that normalize_prime is derivative of normalize.
+        """
+
+        d = KentDistribution.from_spherical(0.3, 0.5, 0.2, 20., 5.)
+        assert np.allclose(d.normalize_prime(), d.log_normalize_prime() * d.normalize())
+
+    def test_fit_recovers_parameters(self):
+        """
+        Check that maximum likelihood fit recovers parameters of sampled distribution.
+        """
+
+        p = Pair(135, 30, 90, 22)
+        g = Group.kent_lin(p, 50, 10, 5000, rng=np.random.default_rng(3))
+        k = g.fit_kent()
+        assert abs(k.kappa - 50) < 5
+        assert abs(k.beta - 10) < 3
+        assert np.degrees(np.arccos(abs(np.dot(k.gamma1, p.lvec)))) < 2
+
+
+class TestKentSampler(unittest.TestCase):
+
+    def test_seed_reproducible(self):
+        """
+        Check that seeded samples are reproduced and are unit vectors.
+        """
+
+        d = KentDistribution.from_spherical(0.3, 0.5, 0.2, 20., 5.)
+        x1 = d.rvs(1000, rng=np.random.default_rng(7))
+        x2 = d.rvs(1000, rng=np.random.default_rng(7))
+        x3 = d.rvs(1000, rng=np.random.default_rng(8))
+        assert x1.shape == (1000, 3)
+        assert np.array_equal(x1, x2)
+        assert not np.array_equal(x1, x3)
+        assert np.allclose(np.linalg.norm(x1, axis=1), 1)
+        x = d.rvs(rng=np.random.default_rng(7))
+        assert x.shape == (3,)
+        assert np.isclose(np.linalg.norm(x), 1)
+
+    def test_fit_recovers_sampled(self):
+        """
+        Check that fit of large sample recovers parameters and axes of
+        sampled distribution, also for large kappa.
+        """
+
+        for k, b in [(40., 8.), (10., 4.), (500., 150.)]:
+            d = KentDistribution.from_spherical(0.7, 1.2, 0.4, k, b)
+            xs = d.rvs(20000, rng=np.random.default_rng(1))
+            assert np.allclose(np.linalg.norm(xs, axis=1), 1)
+            f = KentDistribution.fit(xs)
+            assert abs(f.kappa - k) < 0.05 * k, (k, f.kappa)
+            assert abs(f.beta - b) < 0.1 * b, (b, f.beta)
+            for g, fg in ((d.gamma1, f.gamma1), (d.gamma2, f.gamma2),
+                          (d.gamma3, f.gamma3)):
+                assert np.degrees(np.arccos(min(abs(np.dot(g, fg)), 1))) < 3
+            # major axis is mean direction, not its opposite
+            assert np.dot(f.gamma1, d.gamma1) > 0
+
+
+if __name__ == '__main__':
+
+    unittest.main()
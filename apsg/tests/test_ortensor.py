@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+
+import unittest
+
+import numpy as np
+
+from ..core import Vec3, Lin, Fol, Group, Ortensor, OrtensorAccumulator
+
+
+class TestOrtensorAccumulator(unittest.TestCase):
+
+    def setUp(self):
+
+        self.g = Group.randn_lin(3000, mean=Lin(120, 40), sig=20)
+
+    def chunks(self, g, n):
+
+        return [g[i:i + n] for i in range(0, len(g), n)]
+
+    def test_ortensor_matches_group(self):
+        """
+        Check that accumulated orientation tensor is same as of whole group.
+        """
+
+        acc = OrtensorAccumulator(typ=Lin)
+        for c in self.chunks(self.g, 700):
+            acc.update(c)
+        assert len(acc) == len(self.g)
+        assert np.allclose(acc.ortensor.cov, self.g.ortensor.cov)
+        assert np.allclose(acc.ortensor.eigenvals, self.g.ortensor.eigenvals)
+
+    def test_merge_order_independent(self):
+        """
+        Check that merged accumulators do not depend on order of merging.
+        """
+
+        accs = []
+        for c in self.chunks(self.g, 500):
+            acc = OrtensorAccumulator(typ=Lin)
+            acc.update(c)
+            accs.append(acc)
+        a = accs[0]
+        for acc in accs[1:]:
+            a = a + acc
+        b = accs[-1]
+        for acc in accs[-2::-1]:
+            b = b + acc
+        assert np.allclose(a.tensor, b.tensor)
+        assert np.allclose(a.R, b.R)
+        assert np.allclose(a.axis, b.axis)
+        assert np.isclose(a.fisher_stats['k'], b.fisher_stats['k'])
+
+    def test_axial_resultant(self):
+        """
+        Check that resultant of axial data is close to resultant of group
+        also when chunks are flipped.
+        """
+
+        acc = OrtensorAccumulator(typ=Lin)
+        for i, c in enumerate(self.chunks(self.g, 300)):
+            acc.update(-np.asarray(c) if i % 2 else c)
+        assert acc.R.angle(self.g.R) < 1
+        assert abs(abs(acc.R) - abs(self.g.R)) / len(self.g) < 0.02
+
+    def test_vec3_resultant(self):
+        """
+        Check that resultant of vectors is same as of group.
+        """
+
+        g = self.g.asvec3
+        acc = OrtensorAccumulator(typ=Vec3)
+        for c in self.chunks(g, 700):
+            acc.update(c)
+        assert np.allclose(acc.R, g.R)
+        assert np.isclose(acc.var, g.var)
+
+
+class TestOrtensorLabels(unittest.TestCase):
+
+    def test_scalar_properties(self):
+        """
+        Check that properties of single tensor are scalars.
+        """
+
+        ot = Ortensor(Group.randn_fol(100, mean=Fol(120, 40)))
+        for p in ('E1', 'E2', 'E3', 'shape', 'strength', 'MAD'):
+            assert np.ndim(getattr(ot, p)) == 0
+            assert not isinstance(getattr(ot, p), np.ndarray)
+        repr(ot)
+
+    def test_from_labels(self):
+        """
+        Check that stacked tensors are same as tensors of labeled subgroups.
+        """
+
+        g = Group.randn_lin(300)
+        labels = np.arange(300) % 3
+        ot = Ortensor.from_labels(g, labels)
+        for i in range(3):
+            o = Ortensor(g[labels == i])
+            assert np.allclose(ot.eigenvals[i], o.eigenvals)
+            assert np.isclose(ot.E1[i], o.E1)
+
+
+if __name__ == '__main__':
+
+    unittest.main()
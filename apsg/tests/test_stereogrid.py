@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+
+import unittest
+
+import numpy as np
+
+from ..core import Lin, Group, StereoGrid
+from ..helpers import (_linear_inverse_kamb, _square_inverse_kamb,
+                       _schmidt_count, _kamb_count, _exponential_kamb)
+
+
+KERNELS = {'linear_kamb': _linear_inverse_kamb,
+           'square_kamb': _square_inverse_kamb,
+           'schmidt': _schmidt_count,
+           'kamb': _kamb_count,
+           'exp_kamb': _exponential_kamb}
+
+
+def scalar_density(dcgrid, dcdata, method, sigma, weighted=False):
+    """Density evaluated node by node"""
+    if weighted:
+        weights = np.linalg.norm(dcdata, axis=1)
+        weights /= weights.mean()
+    else:
+        weights = np.ones(len(dcdata))
+    values = np.zeros(len(dcgrid))
+    for i in range(len(dcgrid)):
+        dist = np.abs(np.dot(dcgrid[i], dcdata.T))
+        count, scale = KERNELS[method](dist, sigma)
+        values[i] = ((count * weights).sum() - 0.5) / scale
+    return values
+
+
+class TestStereoGridDensity(unittest.TestCase):
+
+    def setUp(self):
+
+        self.g = Group.randn_lin(300, mean=Lin(120, 40), sig=20)
+        self.sigma = 1. / len(self.g)**(-1. / 7)
+
+    def test_density_match_scalar(self):
+        """
+        Check that density of all methods match node by node evaluation.
+        """
+
+        dc = np.asarray(self.g)
+        for method in KERNELS:
+            ref = None
+            for kw in ({}, {'blocksize': 1000}, {'workers': 2},
+                       {'neighbours': False}):
+                s = StereoGrid(self.g, method=method, npoints=600, **kw)
+                if ref is None:
+                    ref = scalar_density(s.dcgrid, dc, method, self.sigma)
+                assert np.allclose(s.values, ref), (method, kw)
+
+    def test_weighted_density_match_scalar(self):
+        """
+        Check that weighted density match node by node evaluation.
+        """
+
+        rng = np.random.default_rng(2)
+        g = Group.from_dc(np.asarray(self.g) * rng.uniform(0.5, 2, (300, 1)),
+                          typ=Lin)
+        dc = np.asarray(g)
+        for method in ('kamb', 'exp_kamb'):
+            s = StereoGrid(g, method=method, weighted=True, npoints=600)
+            ref = scalar_density(s.dcgrid, dc, method, self.sigma,
+                                 weighted=True)
+            assert np.allclose(s.values, ref), method
+
+    def test_apply_batch_match_apply_func(self):
+        """
+        Check that vectorized grid function give same values as scalar one.
+        """
+
+        v = Lin(210, 30).uv
+        s = StereoGrid(npoints=600)
+        s.apply_func(lambda x: abs(np.dot(x, v)))
+        ref = s.values.copy()
+        s.apply_batch(lambda x: np.abs(np.dot(x, v)), blocksize=100)
+        assert np.allclose(s.values, ref)
+
+
+if __name__ == '__main__':
+
+    unittest.main()
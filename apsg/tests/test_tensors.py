@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+
+import unittest
+
+import numpy as np
+
+from ..core import Vec3, Lin, Fol, Group
+from ..tensors import Stress
+
+
+class TestStressResolve(unittest.TestCase):
+
+    def setUp(self):
+
+        self.S = Stress.from_comp(xx=-5, yy=-2, zz=-10, xy=3, xz=-1, yz=2)
+        self.g = Group.randn_fol(100, mean=Fol(120, 40), sig=40,
+                                 rng=np.random.default_rng(6))
+
+    def test_resolve_match_planes(self):
+        """
+        Check that stress resolved on group match plane by plane evaluation.
+        """
+
+        res = self.S.resolve(self.g)
+        vals = np.linalg.eigvalsh(np.asarray(self.S))
+        for i, f in enumerate(self.g):
+            sn, tau = self.S.stress_comp(f)
+            n = np.asarray(f) / np.linalg.norm(f)
+            normal = np.dot(sn, n)
+            assert np.isclose(res['normal'][i], normal)
+            assert np.isclose(res['shear'][i], abs(tau))
+            assert np.allclose(res['slip'][i], tau.uv)
+            assert np.isclose(res['slip_tendency'][i], abs(tau) / abs(sn))
+            assert np.isclose(res['dilation_tendency'][i],
+                              (vals[0] - normal) / (vals[0] - vals[2]))
+            assert np.isclose(self.S.slip_tendency(f),
+                              res['slip_tendency'][i])
+            assert np.isclose(self.S.dilation_tendency(f),
+                              res['dilation_tendency'][i])
+        assert np.allclose(self.S.slip_tendency(self.g), res['slip_tendency'])
+        assert np.allclose(self.S.normal_stress(self.g),
+                           [abs(self.S.stress_comp(f)[0]) for f in self.g])
+        assert np.allclose(self.S.shear_stress(self.g),
+                           [abs(self.S.stress_comp(f)[1]) for f in self.g])
+
+    def test_fault_match_planes(self):
+        """
+        Check that faults created on group match faults created plane by
+        plane.
+        """
+
+        fs = self.S.fault(self.g)
+        faults = [self.S.fault(f) for f in self.g]
+        assert len(fs) == len(faults)
+        for f, ref in zip(fs, faults):
+            assert f.fol.angle(ref.fol) < 1e-6
+            assert f.lin.angle(ref.lin) < 1e-6
+
+    def test_tendencies_diagonal(self):
+        """
+        Check tendencies against values computed by hand for diagonal tensor.
+        """
+
+        S = Stress([[-8, 0, 0], [0, -5, 0], [0, 0, -1]])
+        g = Group([Vec3([1, 0, 0]), Vec3([0, 0, 1]), Vec3([1, 1, 0]),
+                   Vec3([1, 0, 1])])
+        res = S.resolve(g)
+        # sigma1 = -8, sigma3 = -1
+        assert np.allclose(res['normal'], [-8, -1, -6.5, -4.5])
+        assert np.allclose(res['shear'], [0, 0, 1.5, 3.5])
+        assert np.allclose(res['slip_tendency'],
+                           [0, 0, 1.5 / 6.5, 3.5 / 4.5])
+        assert np.allclose(res['dilation_tendency'], [0, 1, 1.5 / 7, 0.5])
+        assert np.allclose(S.slip_tendency(g), res['slip_tendency'])
+        assert np.allclose(S.dilation_tendency(g), res['dilation_tendency'])
+        assert np.allclose(res['slip'][2], np.array([-1, 1, 0]) / np.sqrt(2))
+        assert np.allclose(res['slip'][0], 0)
+        assert np.isclose(S.slip_tendency(Lin(0, 0)), 0)
+
+
+if __name__ == '__main__':
+
+    unittest.main()